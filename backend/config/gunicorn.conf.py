@@ -1,15 +1,22 @@
 # docker/prod/backend/gunicorn.conf.py
 import multiprocessing
+import os
 
 # Server socket
 bind = "0.0.0.0:8000"
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
+# The default is the classic sync profile. For high concurrency set
+# GUNICORN_WORKER_CLASS=gthread and GUNICORN_THREADS>1: each worker then serves
+# several requests at once, so one slow export no longer blocks a process.
+# Every thread keeps its own persistent DB connection (see DB_CONN_MAX_AGE),
+# so workers * threads must stay below Postgres' max_connections.
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', 1))
 worker_connections = 20
-timeout = 30
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
 keepalive = 2
 
 # Logging
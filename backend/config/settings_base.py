@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Should be first
+    'qa_form.middleware.RequestMetricsMiddleware',  # Measures everything below it
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,9 +73,27 @@ DATABASES = {
         'PASSWORD': 'postgres',
         'HOST': 'db',
         'PORT': 5432,
+        # Keep connections open between requests instead of reconnecting on
+        # every request; each gunicorn thread holds one
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas: DB_REPLICA_HOSTS=host[:port],... adds the aliases replica1,
+# replica2, ... with the primary's credentials. Safe API requests read from
+# them (see qa_form.db_router); writes and migrations stay on default
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': int(port or DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['qa_form.db_router.ReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,6 +118,10 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = []  # Add directories here when needed
 
+# Uploaded and generated files (export job results); not served directly,
+# downloads go through the API. Must be shared by the web and worker containers
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Rest Framework settings
@@ -123,7 +146,11 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'qa_form.api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT Settings
@@ -160,3 +187,94 @@ CORS_ALLOWED_ORIGINS = [
     "http://frontend:3000",
 ]
 CORS_ALLOW_CREDENTIALS = True
+
+# QA form settings
+# Number of comments fetched per keyset page when streaming exports
+QA_FORM_EXPORT_BATCH_SIZE = 2000
+# Delta exports: the cursor handed out trails the clock by this many seconds,
+# longer than any write transaction, so rows that commit after the cursor was
+# issued (with an older updated_at) are still returned by the next call. Export
+# jobs are only reused if nothing was written this long before they started
+QA_FORM_CHANGES_OVERLAP_SECONDS = 60
+# Rows of each kind (posts, comments, aspects, deletions) per delta export
+# response; ?limit= overrides up to the max
+QA_FORM_CHANGES_PAGE_SIZE = 1000
+QA_FORM_CHANGES_MAX_PAGE_SIZE = 10000
+# Bulk ingestion: posts per request and posts written per transaction
+QA_FORM_INGEST_MAX_ITEMS = 10000
+QA_FORM_INGEST_BATCH_SIZE = 500
+# Cursor pagination of the qa_form API (?page_size= overrides up to the max)
+QA_FORM_PAGE_SIZE = 50
+QA_FORM_MAX_PAGE_SIZE = 500
+# Dashboard statistics are cached per user and dropped on writes; this bounds
+# how stale they can get when a write lands on another worker's cache
+QA_FORM_DASHBOARD_STATS_TTL = 60
+# Database aliases safe requests may read from, and how long (in seconds) a
+# user's reads stay on the primary after they write, to cover replication lag
+QA_FORM_REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+QA_FORM_PRIMARY_PIN_SECONDS = int(os.getenv('DB_PRIMARY_PIN_SECONDS', 10))
+# Source typeahead: the in-process index is reloaded at least this often (in
+# seconds), looks up the shared sources version (bumped when sources are
+# created, renamed or deleted) at most every CHECK_SECONDS, and buffered
+# usage_count increments are written every FLUSH_SECONDS
+QA_FORM_SOURCE_INDEX_MAX_AGE = 60
+QA_FORM_SOURCE_INDEX_CHECK_SECONDS = 2
+QA_FORM_SOURCE_USAGE_FLUSH_SECONDS = 5
+# Review queue: how long (in seconds) a claimed post stays leased to its
+# reviewer, the most posts one claim hands out, and the group whose members
+# (besides staff) may claim every collector's posts rather than their own
+QA_FORM_QUEUE_LEASE_SECONDS = 600
+QA_FORM_QUEUE_MAX_CLAIM = 50
+QA_FORM_REVIEWER_GROUP = 'reviewers'
+# Admin: tables bigger than this (in rows) show an estimated count on their
+# unfiltered changelist, and inlines show at most this many related rows
+QA_FORM_ADMIN_EXACT_COUNT_LIMIT = 100000
+QA_FORM_ADMIN_INLINE_ROWS = 50
+# Request metrics (see qa_form/metrics.py): queries slower than this (in ms)
+# are kept as samples, the latest of which are reported, and each worker
+# publishes its counters to the cache this often (in seconds)
+QA_FORM_METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+QA_FORM_METRICS_SLOW_QUERY_MS = int(os.getenv('METRICS_SLOW_QUERY_MS', 200))
+QA_FORM_METRICS_SLOW_QUERY_SAMPLES = 50
+QA_FORM_METRICS_PUBLISH_SECONDS = 15
+# Export jobs (see qa_form/api/jobs.py): finished files are kept for this long
+# (in seconds); a running job whose worker reported no progress for
+# STALE_SECONDS is handed to another worker, at most MAX_ATTEMPTS times in all
+QA_FORM_EXPORT_JOB_TTL = 24 * 3600
+QA_FORM_EXPORT_JOB_STALE_SECONDS = 300
+QA_FORM_EXPORT_JOB_MAX_ATTEMPTS = 3
+# Deduplication on ingest (see qa_form/api/ingest.py): a post whose normalized
+# caption matches a stored post of the same user and source is either 'merge'd
+# (its new comments are added to the stored post) or 'skip'ped; 'off', the
+# default, stores it anyway. Unless 'off', comments repeating one of their
+# post's are dropped. With NEAR, MinHash similarity at or above NEAR_THRESHOLD
+# also counts as a duplicate
+QA_FORM_DEDUP_MODE = os.getenv('DEDUP_MODE', 'off')
+QA_FORM_DEDUP_NEAR = os.getenv('DEDUP_NEAR', 'false').lower() == 'true'
+QA_FORM_DEDUP_NEAR_THRESHOLD = 0.8
+
+# Cache shared by the qa_form features above. The default is per-process; point
+# it at a shared in-memory backend (Redis or memcached) in multi-worker
+# deployments, otherwise a write only pins the user to the primary on the worker
+# that served it and /api/metrics/ only sees one worker. settings_prod uses
+# Redis, and `manage.py check` warns when metrics or replicas are on with a
+# per-process cache.
+# Backends that cull themselves (locmem, database, file) drop a third of their
+# keys, primary pins and dashboard stats included, once they hold MAX_ENTRIES;
+# Redis and memcached are bounded by their server's memory limit instead
+CACHE_MAX_ENTRIES = int(os.getenv('DJANGO_CACHE_MAX_ENTRIES', 100000))
+
+
+def cache_config(backend, location):
+    config = {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', backend),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', location),
+    }
+    if not config['BACKEND'].endswith(('RedisCache', 'MemcacheCache', 'PyLibMCCache', 'PyMemcacheCache')):
+        config['OPTIONS'] = {'MAX_ENTRIES': CACHE_MAX_ENTRIES}
+    return config
+
+
+CACHES = {
+    'default': cache_config('django.core.cache.backends.locmem.LocMemCache', 'qa-form'),
+}
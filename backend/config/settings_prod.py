@@ -28,6 +28,14 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
+# Gunicorn runs several worker processes, and all of them have to see the
+# metrics snapshots and the replica router's primary pins: keep the cache in
+# Redis (the redis service of docker/prod), which answers without touching
+# Postgres
+CACHES = {
+    'default': cache_config('django.core.cache.backends.redis.RedisCache', 'redis://redis:6379/0'),
+}
+
 
 # Production logging
 # LOGGING = {
@@ -65,5 +73,10 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'INFO',
         },
+        # Slow query samples of the request metrics
+        'qa_form.metrics': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
     },
 }
\ No newline at end of file
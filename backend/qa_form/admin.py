@@ -1,78 +1,294 @@
 # backend/qa_form/admin.py
+from django.conf import settings
 from django.contrib import admin
-from .models import Post, Comment, Aspect, Source
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from .models import Post, Comment, Aspect, Source, ExportJob, Tombstone
 
-class AspectInline(admin.TabularInline):  # or use StackedInline for more detailed view
+
+def count_of(queryset, group_by):
+    """Correlated COUNT(*) of ``queryset`` rows per ``group_by`` = outer pk."""
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(**{group_by: OuterRef('pk')})
+            .order_by()
+            .values(group_by)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count of unfiltered changelists on
+    PostgreSQL from the planner statistics instead of a COUNT(*) over the
+    whole table, once the table holds more than
+    QA_FORM_ADMIN_EXACT_COUNT_LIMIT rows. Filtered and searched lists, and
+    small tables, are still counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > settings.QA_FORM_ADMIN_EXACT_COUNT_LIMIT:
+                return row[0]
+        return super().count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables with millions of rows."""
+    paginator = EstimatedCountPaginator
+    # Don't count the whole table again to show "N total" next to filtered results
+    show_full_result_count = False
+
+
+class TrackPostChangesMixin:
+    """
+    Record admin writes like the API does: bump the version and updated_at
+    of the posts they change, so their ETags and the delta exports see it,
+    and leave a Tombstone for every explicitly deleted row. ``post_lookup``
+    and ``owner_lookup`` lead from the admin's model to the post id and to
+    its collector.
+    """
+    post_lookup = 'pk'
+    owner_lookup = 'user_id'
+
+    def post_ids(self, objs):
+        return list(
+            self.model.objects
+            .filter(pk__in=[obj.pk for obj in objs])
+            .values_list(self.post_lookup, flat=True)
+        )
+
+    def deletions(self, objs):
+        """``(object_id, user_id)`` pairs of ``objs`` for ``Tombstone.record``."""
+        return list(
+            self.model.objects
+            .filter(pk__in=[obj.pk for obj in objs])
+            .values_list('pk', self.owner_lookup)
+        )
+
+    def save_model(self, request, obj, form, change):
+        # The post the object belonged to before the change, too
+        before = self.post_ids([obj]) if change else []
+        super().save_model(request, obj, form, change)
+        Post.touch(before + self.post_ids([obj]))
+
+    def save_formset(self, request, form, formset, change):
+        deleted_ids = [inline.instance.pk for inline in formset.deleted_forms if inline.instance.pk]
+        super().save_formset(request, form, formset, change)
+        if deleted_ids:
+            # Inline rows belong to the collector of the object edited
+            [(_, user_id)] = self.deletions([form.instance])
+            Tombstone.record(
+                formset.model._meta.model_name, [(object_id, user_id) for object_id in deleted_ids]
+            )
+        Post.touch(self.post_ids([form.instance]))
+
+    def delete_model(self, request, obj):
+        post_ids, deleted = self.post_ids([obj]), self.deletions([obj])
+        super().delete_model(request, obj)
+        Tombstone.record(self.model._meta.model_name, deleted)
+        Post.touch(post_ids)
+
+    def delete_queryset(self, request, queryset):
+        post_ids, deleted = self.post_ids(queryset), self.deletions(queryset)
+        super().delete_queryset(request, queryset)
+        Tombstone.record(self.model._meta.model_name, deleted)
+        Post.touch(post_ids)
+
+
+class SourceListFilter(admin.SimpleListFilter):
+    """
+    Filter by source offering only the most used sources (plus the one
+    selected), instead of one link per source; any other source can be
+    picked by searching for its name.
+    """
+    title = 'source'
+    parameter_name = 'source'
+    lookup = 'source_id'
+    choices_shown = 20
+
+    def lookups(self, request, model_admin):
+        sources = list(
+            Source.objects.order_by('-usage_count', 'name').values_list('id', 'name')[:self.choices_shown]
+        )
+        selected = self.value()
+        if selected and selected.isdigit() and int(selected) not in dict(sources):
+            sources += list(Source.objects.filter(pk=selected).values_list('id', 'name'))
+        return [(str(source_id), name) for source_id, name in sources]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(**{self.lookup: self.value()})
+        return queryset
+
+
+class PostSourceListFilter(SourceListFilter):
+    lookup = 'post__source_id'
+
+
+class BoundedInlineFormSet(BaseInlineFormSet):
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            # Already narrowed to this parent's children, so the limit
+            # applies per parent. A filter rather than a slice, so the
+            # formset can still save
+            queryset = super().get_queryset()
+            self._queryset = queryset.filter(
+                pk__in=Subquery(
+                    queryset.order_by('pk').values('pk')[:settings.QA_FORM_ADMIN_INLINE_ROWS]
+                )
+            )
+        return self._queryset
+
+
+class BoundedInline(admin.TabularInline):
+    """
+    Inline that shows at most QA_FORM_ADMIN_INLINE_ROWS related rows (the
+    oldest ones), so a parent with thousands of children still renders.
+    The rest are listed on the child changelist, linked from the parent.
+    """
+    extra = 0
+    formset = BoundedInlineFormSet
+
+
+class AspectInline(BoundedInline):  # or use StackedInline for more detailed view
     model = Aspect
     extra = 1  # Number of empty forms to display
     fields = ['aspect_name', 'sentiment']
 
-class CommentInline(admin.TabularInline):
+class CommentInline(BoundedInline):
     model = Comment
     extra = 1
     fields = ['text', 'general_sentiment']
     show_change_link = True  # Allows clicking through to the comment detail page
 
+def related_changelist_link(model, lookup, obj, count):
+    if obj is None or obj.pk is None:
+        return '-'
+    url = reverse(f'admin:qa_form_{model._meta.model_name}_changelist')
+    label = f'All {count} {model._meta.verbose_name_plural}'
+    if count > settings.QA_FORM_ADMIN_INLINE_ROWS:
+        label += f' (the first {settings.QA_FORM_ADMIN_INLINE_ROWS} are shown below)'
+    return format_html('<a href="{}?{}={}">{}</a>', url, lookup, obj.pk, label)
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(TrackPostChangesMixin, ScalableAdmin):
     list_display = ['id', 'source', 'caption', 'comment_count', 'created_at']
-    list_filter = ['source', 'created_at']
+    list_filter = [SourceListFilter, 'status', 'created_at']
+    list_select_related = ['source']
     search_fields = ['caption']
+    autocomplete_fields = ['source', 'user', 'reviewed_by', 'claimed_by']
+    readonly_fields = ['all_comments']
     inlines = [CommentInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            comment_count=count_of(Comment.objects.all(), 'post_id')
+        )
+
+    @admin.display(description='Comments', ordering='comment_count')
     def comment_count(self, obj):
-        return obj.comments.count()
-    comment_count.short_description = 'Comments'
+        return obj.comment_count
+
+    @admin.display(description='Comments')
+    def all_comments(self, obj):
+        return related_changelist_link(Comment, 'post__id__exact', obj, getattr(obj, 'comment_count', 0))
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(TrackPostChangesMixin, ScalableAdmin):
+    post_lookup = 'post_id'
+    owner_lookup = 'post__user_id'
     list_display = ['id', 'truncated_text', 'post_link', 'aspect_count', 'general_sentiment', 'created_at']
-    list_filter = ['general_sentiment', 'created_at', 'post__source']
+    list_filter = ['general_sentiment', 'created_at', PostSourceListFilter]
+    list_select_related = ['post']
     search_fields = ['text', 'post__caption']
+    autocomplete_fields = ['post']
+    readonly_fields = ['all_aspects']
     inlines = [AspectInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            aspect_count=count_of(Aspect.objects.all(), 'comment_id')
+        )
+
     def truncated_text(self, obj):
         return obj.text[:100] + '...' if len(obj.text) > 100 else obj.text
     truncated_text.short_description = 'Comment Text'
 
     def post_link(self, obj):
-        from django.utils.html import format_html
         return format_html('<a href="{}">{}</a>',
-            f'/admin/qa_form/post/{obj.post.id}/change/',
-            f'Post #{obj.post.id}: {obj.post.caption[:50]}...'
+            f'/admin/qa_form/post/{obj.post_id}/change/',
+            f'Post #{obj.post_id}: {obj.post.caption[:50]}...'
         )
     post_link.short_description = 'Post'
 
+    @admin.display(description='Aspects', ordering='aspect_count')
     def aspect_count(self, obj):
-        return obj.aspects.count()
-    aspect_count.short_description = 'Aspects'
+        return obj.aspect_count
+
+    @admin.display(description='Aspects')
+    def all_aspects(self, obj):
+        return related_changelist_link(Aspect, 'comment__id__exact', obj, getattr(obj, 'aspect_count', 0))
 
 @admin.register(Aspect)
-class AspectAdmin(admin.ModelAdmin):
+class AspectAdmin(TrackPostChangesMixin, ScalableAdmin):
+    post_lookup = 'comment__post_id'
+    owner_lookup = 'comment__post__user_id'
     list_display = ['id', 'aspect_name', 'comment_link', 'post_link', 'sentiment']
     list_filter = ['sentiment', 'comment__general_sentiment']
     search_fields = ['aspect_name', 'comment__text', 'comment__post__caption']
+    autocomplete_fields = ['comment']
+
+    def get_queryset(self, request):
+        # The links only need the ids: read the post id through the join
+        # instead of loading the comment and post rows
+        return super().get_queryset(request).annotate(post_id=F('comment__post_id'))
 
     def comment_link(self, obj):
-        from django.utils.html import format_html
         return format_html('<a href="{}">{}</a>',
-            f'/admin/qa_form/comment/{obj.comment.id}/change/',
-            f'Comment #{obj.comment.id}'
+            f'/admin/qa_form/comment/{obj.comment_id}/change/',
+            f'Comment #{obj.comment_id}'
         )
     comment_link.short_description = 'Comment'
 
     def post_link(self, obj):
-        from django.utils.html import format_html
         return format_html('<a href="{}">{}</a>',
-            f'/admin/qa_form/post/{obj.comment.post.id}/change/',
-            f'Post #{obj.comment.post.id}'
+            f'/admin/qa_form/post/{obj.post_id}/change/',
+            f'Post #{obj.post_id}'
         )
     post_link.short_description = 'Post'
 
 @admin.register(Source)
-class SourceAdmin(admin.ModelAdmin):
+class SourceAdmin(ScalableAdmin):
     list_display = ['id', 'name', 'usage_count', 'created_at', 'last_used']
     list_filter = ['created_at', 'last_used']
     search_fields = ['name']
     readonly_fields = ['usage_count', 'created_at', 'last_used']
     ordering = ['-usage_count', '-last_used']
+
+@admin.register(ExportJob)
+class ExportJobAdmin(ScalableAdmin):
+    list_display = ['id', 'user', 'format', 'status', 'rows_done', 'rows_total', 'size', 'created_at', 'expires_at']
+    list_filter = ['status', 'format', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['user__username']
+    readonly_fields = [field.name for field in ExportJob._meta.fields]
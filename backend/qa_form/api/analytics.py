@@ -0,0 +1,195 @@
+# backend/qa_form/api/analytics.py
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from ..models import (
+    Post, Comment, Aspect, Tombstone,
+    AspectSentimentRollup, CommentSentimentRollup, RollupRefresh,
+)
+
+# Group-by dimensions of each rollup: name -> lookup or expression over
+# the rollup table. 'collector' is only offered to staff.
+ASPECT_DIMENSIONS = {
+    'day': 'day',
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+    'source': 'source__name',
+    'aspect_name': 'aspect_name',
+    'sentiment': 'sentiment',
+    'collector': 'user__username',
+}
+SENTIMENT_DIMENSIONS = {
+    'day': 'day',
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+    'source': 'source__name',
+    'general_sentiment': 'general_sentiment',
+    'collector': 'user__username',
+}
+
+# Filters of each rollup: query parameter -> lookup
+ASPECT_FILTERS = {
+    'date_from': 'day__gte',
+    'date_to': 'day__lte',
+    'source': 'source__name',
+    'aspect_name': 'aspect_name',
+    'sentiment': 'sentiment',
+    'collector': 'user__username',
+}
+SENTIMENT_FILTERS = {
+    'date_from': 'day__gte',
+    'date_to': 'day__lte',
+    'source': 'source__name',
+    'sentiment': 'general_sentiment',
+    'collector': 'user__username',
+}
+
+
+def query_rollup(model, dimensions, lookups, group_by, filters, user=None):
+    """
+    Sum the counts of a rollup ``model`` grouped by the ``group_by``
+    dimension names, optionally restricted to the rollup rows of ``user``.
+    Returns one dict per group, keyed by dimension name plus 'count'.
+    """
+    rows = model.objects.all()
+    if user is not None:
+        rows = rows.filter(user=user)
+    rows = rows.filter(**{lookups[name]: value for name, value in filters.items()})
+
+    # Expressions are annotated under their own name; plain lookups are
+    # selected as is and renamed below
+    expressions = {
+        name: dimensions[name] for name in group_by if not isinstance(dimensions[name], str)
+    }
+    columns = [name if name in expressions else dimensions[name] for name in group_by]
+    rows = (
+        rows
+        .annotate(**expressions)
+        .values(*columns)
+        .annotate(count=Sum('count'))
+        .order_by(*columns)
+    )
+    return [
+        {**{name: row[column] for name, column in zip(group_by, columns)}, 'count': row['count']}
+        for row in rows
+    ]
+
+
+def find_dirty_partitions(since):
+    """
+    Return ``{user_id: days}`` for every (collector, day) partition with a
+    post, comment or aspect written after ``since``. Deleted posts leave
+    no row to read the day from, so their collector maps to None, meaning
+    every day. Comment and aspect deletions touch their post.
+    """
+    partitions = {}
+    changed = [
+        Post.objects.filter(updated_at__gt=since)
+        .annotate(partition_user=F('user_id'), partition_day=TruncDate('created_at')),
+        Comment.objects.filter(updated_at__gt=since)
+        .annotate(partition_user=F('post__user_id'), partition_day=TruncDate('post__created_at')),
+        Aspect.objects.filter(updated_at__gt=since)
+        .annotate(partition_user=F('comment__post__user_id'),
+                  partition_day=TruncDate('comment__post__created_at')),
+    ]
+    for rows in changed:
+        for user_id, day in rows.order_by().values_list('partition_user', 'partition_day').distinct():
+            partitions.setdefault(user_id, set()).add(day)
+
+    deleted_posts = (
+        Tombstone.objects
+        .filter(object_type='post', deleted_at__gt=since)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    for user_id in deleted_posts:
+        partitions[user_id] = None
+    return partitions
+
+
+@transaction.atomic
+def rebuild_partition(user_id, days=None):
+    """Recompute the rollup rows of one collector, for ``days`` or every day."""
+    aspects = Aspect.objects.filter(comment__post__user_id=user_id)
+    comments = Comment.objects.filter(post__user_id=user_id)
+    aspect_rollups = AspectSentimentRollup.objects.filter(user_id=user_id)
+    comment_rollups = CommentSentimentRollup.objects.filter(user_id=user_id)
+    if days is not None:
+        aspects = aspects.filter(comment__post__created_at__date__in=days)
+        comments = comments.filter(post__created_at__date__in=days)
+        aspect_rollups = aspect_rollups.filter(day__in=days)
+        comment_rollups = comment_rollups.filter(day__in=days)
+
+    aspect_rollups.delete()
+    comment_rollups.delete()
+
+    AspectSentimentRollup.objects.bulk_create(
+        [
+            AspectSentimentRollup(user_id=user_id, **row)
+            for row in (
+                aspects
+                .values(
+                    'aspect_name', 'sentiment',
+                    day=TruncDate('comment__post__created_at'),
+                    source_id=F('comment__post__source_id'),
+                )
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+        ],
+        batch_size=5000
+    )
+    CommentSentimentRollup.objects.bulk_create(
+        [
+            CommentSentimentRollup(user_id=user_id, **row)
+            for row in (
+                comments
+                .values(
+                    'general_sentiment',
+                    day=TruncDate('post__created_at'),
+                    source_id=F('post__source_id'),
+                )
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+        ],
+        batch_size=5000
+    )
+
+
+def refresh_rollups(full=False, overlap=60):
+    """
+    Bring the rollup tables up to date and return the RollupRefresh run.
+
+    Only the partitions written since the previous run (minus ``overlap``
+    seconds, for transactions that committed late) are recomputed. A
+    ``full`` refresh, and the first refresh ever, rebuilds every collector.
+    """
+    started_at = timezone.now()
+    last = RollupRefresh.objects.order_by('-started_at').first()
+
+    if full or last is None:
+        partitions = {
+            user_id: None
+            for user_id in Post.objects.order_by().values_list('user_id', flat=True).distinct()
+        }
+        # Collectors without posts anymore still have rows to drop
+        AspectSentimentRollup.objects.exclude(user_id__in=list(partitions)).delete()
+        CommentSentimentRollup.objects.exclude(user_id__in=list(partitions)).delete()
+        full = True
+    else:
+        partitions = find_dirty_partitions(last.started_at - timedelta(seconds=overlap))
+
+    for user_id, days in partitions.items():
+        rebuild_partition(user_id, days)
+
+    return RollupRefresh.objects.create(
+        started_at=started_at,
+        finished_at=timezone.now(),
+        full=full,
+        partitions=sum(len(days) if days is not None else 1 for days in partitions.values()),
+    )
@@ -0,0 +1,106 @@
+# backend/qa_form/api/conditional.py
+import hashlib
+from datetime import date
+from functools import wraps
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from ..models import Post, Tombstone
+from .queue import reviewable_posts
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def per_user(queryset, aggregate):
+    """Scalar subquery of ``aggregate`` over the outer user's rows of ``queryset``."""
+    return Subquery(
+        queryset.filter(user=OuterRef('pk')).order_by()
+        .values('user').annotate(value=aggregate).values('value')
+    )
+
+
+def posts_etag(request):
+    """
+    ETag of a response derived from all of the user's posts: it changes with
+    every write (comment and aspect writes touch the post) and deletion.
+
+    Timestamps alone would miss a transaction that commits after a later
+    one, with older updated_at values, so the number of posts and the sum
+    of their versions (bumped by every update) are part of it, and the
+    number of tombstones next to the latest one. All come from one query
+    of index-only scans (see post_user_changes_idx).
+    """
+    posts, tombstones = Post.objects.all(), Tombstone.objects.all()
+    latest = (
+        User.objects
+        .filter(pk=request.user.pk)
+        .annotate(
+            updated=per_user(posts, Max('updated_at')),
+            post_count=per_user(posts, Count('*')),
+            versions=per_user(posts, Sum('version')),
+            deleted=per_user(tombstones, Max('deleted_at')),
+            tombstone_count=per_user(tombstones, Count('*')),
+        )
+        .values_list('updated', 'post_count', 'versions', 'deleted', 'tombstone_count')
+        .first()
+    )
+    # The path carries the cursor and filters; the date moves the dashboard
+    return make_etag(request.user.pk, *latest, request.get_full_path(), date.today())
+
+
+def post_etag(request, pk):
+    """
+    ETag of a single post the user may read (see ``reviewable_posts``),
+    from its version; None if there is no such post.
+    """
+    if not str(pk).isdigit():
+        return None
+    version = (
+        reviewable_posts(request.user)
+        .filter(pk=pk)
+        .values_list('version', flat=True)
+        .first()
+    )
+    return version and make_etag(request.user.pk, pk, version, request.get_full_path())
+
+
+def conditional_response(request, etag, get_response):
+    """
+    Answer 304 Not Modified if the client's ``If-None-Match`` matches
+    ``etag``, without calling ``get_response``; otherwise call it and tag the
+    response. Responses are private and must be revalidated before reuse.
+    """
+    response = None
+    if etag is not None:
+        response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = get_response()
+    if etag is not None and response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def etag_from_posts(view):
+    """Make a list-like view conditional on ``posts_etag``."""
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        return conditional_response(
+            request, posts_etag(request), lambda: view(self, request, *args, **kwargs)
+        )
+    return wrapper
+
+
+def etag_from_post(view):
+    """Make a detail view conditional on ``post_etag`` of its ``pk``."""
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        return conditional_response(
+            request, post_etag(request, kwargs['pk']), lambda: view(self, request, *args, **kwargs)
+        )
+    return wrapper
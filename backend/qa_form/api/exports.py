@@ -0,0 +1,366 @@
+# backend/qa_form/api/exports.py
+import base64
+import binascii
+import csv
+import json
+import zlib
+from collections import defaultdict
+
+import orjson
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from ..models import Post, Comment, Aspect, Tombstone
+
+CSV_HEADER = [
+    'post_id',
+    'source',
+    'caption',
+    'comment',
+    'aspects_and_sentiments',
+    'general_sentiment',
+    'collector',
+    'created_at'
+]
+
+COMMENT_COLUMNS = (
+    'id',
+    'post_id',
+    'text',
+    'general_sentiment',
+    'post__caption',
+    'post__source__name',
+    'post__user__username',
+    'post__status',
+    'post__created_at',
+)
+
+ASPECT_COLUMNS = ('id', 'comment_id', 'aspect_name', 'aspect_text', 'sentiment')
+
+
+def iter_comment_batches(posts, batch_size=None, progress=None):
+    """
+    Walk the comments of ``posts`` in (post_id, id) order, one keyset page
+    at a time, and yield each page as a list of ``(comment, aspects)`` pairs.
+
+    Every page costs two queries (comments joined to post/source/user, then
+    their aspects), so memory is bounded by ``batch_size`` rather than by the
+    size of the dataset. ``progress``, if given, is called with the number of
+    comments in each page once it has been processed.
+    """
+    batch_size = batch_size or settings.QA_FORM_EXPORT_BATCH_SIZE
+    comments = (
+        Comment.objects
+        .filter(post__in=posts.values('pk'))
+        .order_by('post_id', 'id')
+        .values_list(*COMMENT_COLUMNS, named=True)
+    )
+
+    last = None
+    while True:
+        page = comments
+        if last is not None:
+            page = page.filter(
+                Q(post_id__gt=last.post_id) | Q(post_id=last.post_id, id__gt=last.id)
+            )
+        rows = list(page[:batch_size])
+        if not rows:
+            return
+
+        aspects = defaultdict(list)
+        aspect_rows = (
+            Aspect.objects
+            .filter(comment_id__in=[row.id for row in rows])
+            .order_by('id')
+            .values_list(*ASPECT_COLUMNS, named=True)
+        )
+        for aspect in aspect_rows:
+            aspects[aspect.comment_id].append(aspect)
+
+        yield [(row, aspects[row.id]) for row in rows]
+        if progress is not None:
+            progress(len(rows))
+        last = rows[-1]
+
+
+class Echo:
+    """Pseudo-buffer whose write() returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(posts, batch_size=None, progress=None):
+    """Yield the ``export_csv`` file for ``posts``, one chunk per batch."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+
+    for batch in iter_comment_batches(posts, batch_size, progress):
+        lines = []
+        for comment, aspects in batch:
+            aspects_data = {
+                aspect.aspect_name: aspect.sentiment
+                for aspect in aspects
+            }
+            lines.append(writer.writerow([
+                comment.post_id,
+                comment.post__source__name,
+                comment.post__caption,
+                comment.text,
+                json.dumps(aspects_data),
+                comment.general_sentiment,
+                comment.post__user__username,
+                comment.post__created_at.strftime('%Y-%m-%d %H:%M:%S')
+            ]))
+        yield ''.join(lines)
+
+
+def iter_csv_gz(posts, batch_size=None, progress=None):
+    """Yield the ``export_csv`` file as gzip-compressed UTF-8."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in iter_csv(posts, batch_size, progress):
+        yield compressor.compress(chunk.encode('utf-8'))
+    yield compressor.flush()
+
+
+# One row per aspect; comments without aspects get a single row whose aspect
+# columns are null, so no comment is lost from the dataset
+DATASET_COLUMNS = [
+    ('post_id', 'int64'),
+    ('source', 'string'),
+    ('caption', 'string'),
+    ('collector', 'string'),
+    ('status', 'string'),
+    ('post_created_at', 'timestamp'),
+    ('comment_id', 'int64'),
+    ('comment_text', 'string'),
+    ('general_sentiment', 'string'),
+    ('aspect_id', 'int64'),
+    ('aspect_name', 'string'),
+    ('aspect_text', 'string'),
+    ('sentiment', 'string'),
+]
+
+
+def iter_dataset_batches(posts, batch_size=None, progress=None):
+    """Yield the normalized dataset for ``posts`` as lists of row dicts."""
+    for batch in iter_comment_batches(posts, batch_size, progress):
+        rows = []
+        for comment, aspects in batch:
+            base = {
+                'post_id': comment.post_id,
+                'source': comment.post__source__name,
+                'caption': comment.post__caption,
+                'collector': comment.post__user__username,
+                'status': comment.post__status,
+                'post_created_at': comment.post__created_at,
+                'comment_id': comment.id,
+                'comment_text': comment.text,
+                'general_sentiment': comment.general_sentiment,
+            }
+            for aspect in aspects or [None]:
+                rows.append({
+                    **base,
+                    'aspect_id': aspect and aspect.id,
+                    'aspect_name': aspect and aspect.aspect_name,
+                    'aspect_text': aspect and aspect.aspect_text,
+                    'sentiment': aspect and aspect.sentiment,
+                })
+        yield rows
+
+
+def iter_jsonl_gz(posts, batch_size=None, progress=None):
+    """Yield the dataset as gzip-compressed newline-delimited JSON."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for rows in iter_dataset_batches(posts, batch_size, progress):
+        lines = [
+            orjson.dumps({**row, 'post_created_at': row['post_created_at'].isoformat()})
+            for row in rows
+        ]
+        yield compressor.compress(b'\n'.join(lines) + b'\n')
+    yield compressor.flush()
+
+
+class ChunkSink:
+    """
+    Write-only file object for pyarrow that hands back whatever has been
+    written so far, letting columnar writers be streamed chunk by chunk.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def get_arrow_schema():
+    import pyarrow as pa
+
+    types = {
+        'int64': pa.int64(),
+        'string': pa.string(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in DATASET_COLUMNS])
+
+
+def iter_arrow(posts, file_format, batch_size=None, progress=None):
+    """
+    Yield the dataset as a zstd-compressed Parquet file or Arrow IPC file,
+    writing one record batch per database batch.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = get_arrow_schema()
+    sink = ChunkSink()
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        write_batch = writer.write_batch
+    else:
+        writer = pa.ipc.new_file(
+            sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd')
+        )
+        write_batch = writer.write_batch
+
+    for rows in iter_dataset_batches(posts, batch_size, progress):
+        write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# Dataset formats: format name -> (file extension, content type)
+DATASET_FORMATS = {
+    'jsonl': ('jsonl.gz', 'application/gzip'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def iter_dataset(posts, file_format, batch_size=None, progress=None):
+    """Yield ``posts`` as a normalized dataset file in ``file_format``."""
+    if file_format == 'jsonl':
+        return iter_jsonl_gz(posts, batch_size, progress)
+    # Import eagerly so a missing pyarrow fails before any bytes are sent
+    import pyarrow  # noqa: F401
+    return iter_arrow(posts, file_format, batch_size, progress)
+
+
+POST_CHANGE_FIELDS = (
+    'id', 'caption', 'source__name', 'user_id', 'status', 'reviewed_by_id',
+    'reviewed_at', 'created_at', 'updated_at', 'version',
+)
+COMMENT_CHANGE_FIELDS = (
+    'id', 'post_id', 'text', 'general_sentiment', 'created_at', 'updated_at',
+)
+ASPECT_CHANGE_FIELDS = (
+    'id', 'comment_id', 'aspect_name', 'aspect_text', 'sentiment', 'updated_at',
+)
+TOMBSTONE_CHANGE_FIELDS = ('id', 'object_type', 'object_id', 'deleted_at')
+
+
+def change_sources(user):
+    """Per kind of change: the user's rows, the column dating them and the fields sent."""
+    return {
+        'posts': (Post.objects.filter(user=user), 'updated_at', POST_CHANGE_FIELDS),
+        'comments': (Comment.objects.filter(post__user=user), 'updated_at', COMMENT_CHANGE_FIELDS),
+        'aspects': (Aspect.objects.filter(comment__post__user=user), 'updated_at', ASPECT_CHANGE_FIELDS),
+        'deleted': (Tombstone.objects.filter(user=user), 'deleted_at', TOMBSTONE_CHANGE_FIELDS),
+    }
+
+
+def collect_changes(user, since, until, after=None, limit=None):
+    """
+    Return one page of the user's posts, comments and aspects written in
+    the ``(since, until]`` window as flat rows, plus the ids deleted in it.
+    A ``since`` of None selects everything up to ``until``.
+
+    Each kind is read in (timestamp, id) keyset order, at most ``limit``
+    rows of it (QA_FORM_CHANGES_PAGE_SIZE by default) per page, so a long
+    history is sent in bounded pieces. ``after`` maps kinds to the
+    (timestamp, id) of the last row of the previous page; the result's
+    ``after`` is the one to pass for the next page, and ``more`` tells
+    whether there is one.
+    """
+    after = after or {}
+    limit = limit or settings.QA_FORM_CHANGES_PAGE_SIZE
+    pages, next_after, more = {}, {}, False
+    for kind, (queryset, time_field, fields) in change_sources(user).items():
+        rows = queryset.filter(**{f'{time_field}__lte': until})
+        if since is not None:
+            rows = rows.filter(**{f'{time_field}__gt': since})
+        if kind in after:
+            moment, last_id = after[kind]
+            rows = rows.filter(
+                Q(**{f'{time_field}__gt': moment}) | Q(**{time_field: moment, 'id__gt': last_id})
+            )
+        rows = list(rows.order_by(time_field, 'id').values(*fields)[:limit + 1])
+        if len(rows) > limit:
+            rows, more = rows[:limit], True
+        if rows:
+            next_after[kind] = (rows[-1][time_field], rows[-1]['id'])
+        elif kind in after:
+            next_after[kind] = after[kind]
+        pages[kind] = rows
+
+    deleted = {'posts': [], 'comments': [], 'aspects': []}
+    for row in pages['deleted']:
+        deleted[f"{row['object_type']}s"].append(row['object_id'])
+
+    return {
+        'posts': [{**row, 'source': row.pop('source__name')} for row in pages['posts']],
+        'comments': pages['comments'],
+        'aspects': pages['aspects'],
+        'deleted': deleted,
+        'after': next_after,
+        'more': more,
+    }
+
+
+def encode_changes_cursor(since, until, after):
+    """Opaque cursor of the next page of a ``collect_changes`` window."""
+    state = {
+        'since': since and since.isoformat(),
+        'until': until.isoformat(),
+        'after': {kind: [moment.isoformat(), last_id] for kind, (moment, last_id) in after.items()},
+    }
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def decode_changes_cursor(cursor):
+    """
+    The ``(since, until, after)`` of a cursor made by
+    ``encode_changes_cursor``; raises ValueError if it isn't one.
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        since = state['since'] and parse_datetime(state['since'])
+        until = parse_datetime(state['until'])
+        after = {
+            kind: (parse_datetime(moment), int(last_id))
+            for kind, (moment, last_id) in state['after'].items()
+        }
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError(f'Invalid changes cursor: {cursor!r}')
+    if until is None or None in (moment for moment, _ in after.values()):
+        raise ValueError(f'Invalid changes cursor: {cursor!r}')
+    return since, until, after
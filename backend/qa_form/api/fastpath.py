@@ -0,0 +1,92 @@
+# backend/qa_form/api/fastpath.py
+from collections import defaultdict
+
+from ..models import Comment, Aspect
+from .fieldsets import POST_COUNTS, select_post_counts
+
+# Read-only representation of PostSerializer built from .values() rows, for
+# list responses where DRF's per-field to_representation dominates the CPU
+# time. Keys are in the serializer's field order; datetimes are left to the
+# renderer, which formats them as DRF's DateTimeField does.
+
+# Serializer field -> values() lookup
+POST_LOOKUPS = {
+    'id': 'id',
+    'caption': 'caption',
+    'source': 'source__name',
+    'created_at': 'created_at',
+    'comments': None,
+    'user': 'user_id',
+    'username': 'user__username',
+    'status': 'status',
+    'reviewed_by': 'reviewed_by_id',
+    'reviewed_at': 'reviewed_at',
+    'claimed_by': 'claimed_by_id',
+    'claim_expires_at': 'claim_expires_at',
+    'version': 'version',
+    'comment_count': 'comment_count',
+    'aspect_count': 'aspect_count',
+}
+
+COMMENT_KEYS = ('id', 'text', 'general_sentiment', 'created_at')
+ASPECT_KEYS = ('id', 'aspect_name', 'aspect_text', 'sentiment')
+
+
+def post_values(posts, fields=None):
+    """
+    Turn a Post queryset into the .values() rows ``serialize_post_rows``
+    reads for ``fields`` (None for the full representation). The rows can be
+    paginated like the queryset: they keep id and created_at.
+    """
+    if fields is None:
+        fields = [name for name in POST_LOOKUPS if name not in POST_COUNTS]
+    posts = select_post_counts(posts, fields)
+    lookups = [POST_LOOKUPS[name] for name in fields if POST_LOOKUPS.get(name)]
+    return posts.values(*dict.fromkeys(['id', 'created_at', *lookups]))
+
+
+def serialize_post_rows(rows, fields=None):
+    """
+    Build the PostSerializer representation of ``post_values`` rows, with
+    the comments and aspects of all of them read in one query each.
+    """
+    if fields is None:
+        fields = [name for name in POST_LOOKUPS if name not in POST_COUNTS]
+    columns = [(name, POST_LOOKUPS[name]) for name in fields]
+    comments = fetch_comments([row['id'] for row in rows]) if 'comments' in fields else None
+
+    return [
+        {
+            name: comments.get(row['id'], []) if lookup is None else row[lookup]
+            for name, lookup in columns
+        }
+        for row in rows
+    ]
+
+
+def fetch_comments(post_ids):
+    """Return ``{post_id: [comment, ...]}`` with each comment's aspects nested."""
+    comments = defaultdict(list)
+    if not post_ids:
+        return comments
+
+    comment_rows = (
+        Comment.objects
+        .filter(post_id__in=post_ids)
+        .order_by('id')
+        .values_list('post_id', *COMMENT_KEYS)
+    )
+    aspects = defaultdict(list)
+    aspect_rows = (
+        Aspect.objects
+        .filter(comment__post_id__in=post_ids)
+        .order_by('id')
+        .values_list('comment_id', *ASPECT_KEYS)
+    )
+    for comment_id, *values in aspect_rows:
+        aspects[comment_id].append(dict(zip(ASPECT_KEYS, values)))
+    for post_id, *values in comment_rows:
+        comment = dict(zip(COMMENT_KEYS, values))
+        comment['aspects'] = aspects[comment['id']]
+        comments[post_id].append(comment)
+    return comments
@@ -0,0 +1,104 @@
+# backend/qa_form/api/fieldsets.py
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+
+from ..models import Comment, Aspect
+
+# Compact representation for list and queue screens: ``?fields=summary``
+POST_SUMMARY_FIELDS = [
+    'id', 'caption', 'source', 'created_at', 'user', 'username', 'status',
+    'reviewed_by', 'reviewed_at', 'version', 'comment_count', 'aspect_count',
+]
+
+# Nested relations, only fetched when listed in ``?expand=`` (or ``?fields=``)
+POST_EXPANDABLE_FIELDS = ['comments']
+
+# Post columns read by each serializer field; counts are annotated instead.
+# id and created_at are always read, for the cursor pagination.
+POST_FIELD_COLUMNS = {
+    'caption': ['caption'],
+    'source': ['source', 'source__name'],
+    'user': ['user'],
+    'username': ['user', 'user__username'],
+    'status': ['status'],
+    'reviewed_by': ['reviewed_by'],
+    'reviewed_at': ['reviewed_at'],
+    'claimed_by': ['claimed_by'],
+    'claim_expires_at': ['claim_expires_at'],
+    'version': ['version'],
+}
+
+POST_COUNTS = {
+    'comment_count': lambda: Comment.objects.filter(post=OuterRef('pk')).values('post'),
+    'aspect_count': lambda: Aspect.objects.filter(comment__post=OuterRef('pk')).values('comment__post'),
+}
+
+POST_FIELDS = ['id', 'created_at', *POST_FIELD_COLUMNS, *POST_COUNTS, *POST_EXPANDABLE_FIELDS]
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse_post_fields(query_params):
+    """
+    Return the post fields picked by the ``fields`` and ``expand`` query
+    parameters, or None for the full representation when neither is given.
+
+    ``fields`` is a comma separated list of field names, where ``summary``
+    stands for POST_SUMMARY_FIELDS; without it, ``expand`` adds nested
+    relations to the summary. Unknown names are a validation error.
+    """
+    if 'fields' not in query_params and 'expand' not in query_params:
+        return None
+
+    fields = _split(query_params.get('fields', 'summary'))
+    expand = _split(query_params.get('expand', ''))
+    errors = {}
+    unknown = [name for name in fields if name != 'summary' and name not in POST_FIELDS]
+    if unknown:
+        errors['fields'] = [f"Choose from: summary, {', '.join(POST_FIELDS)}"]
+    unknown = [name for name in expand if name not in POST_EXPANDABLE_FIELDS]
+    if unknown:
+        errors['expand'] = [f"Choose from: {', '.join(POST_EXPANDABLE_FIELDS)}"]
+    if errors:
+        raise ValidationError(errors)
+
+    picked = []
+    for name in fields + expand:
+        picked.extend(POST_SUMMARY_FIELDS if name == 'summary' else [name])
+    return list(dict.fromkeys(picked))
+
+
+def select_post_counts(posts, fields):
+    """Annotate the comment and aspect counts among ``fields``, in SQL."""
+    counts = {
+        name: Coalesce(Subquery(rows().order_by().annotate(count=Count('pk')).values('count')), 0)
+        for name, rows in POST_COUNTS.items() if name in fields
+    }
+    return posts.annotate(**counts) if counts else posts
+
+
+def select_post_fields(posts, fields=None):
+    """
+    Shape a Post queryset for serializing ``fields`` (None for all of them):
+    only the columns and joins they read are selected, comment and aspect
+    counts are computed in SQL, and comments with their aspects are only
+    prefetched when asked for.
+    """
+    if fields is None:
+        return posts.select_related('source', 'user').prefetch_related('comments__aspects')
+
+    columns = ['id', 'created_at']
+    for name in fields:
+        columns.extend(POST_FIELD_COLUMNS.get(name, []))
+    posts = posts.only(*dict.fromkeys(columns))
+
+    related = {column.split('__')[0] for column in columns if '__' in column}
+    if related:
+        posts = posts.select_related(*sorted(related))
+    posts = select_post_counts(posts, fields)
+    if 'comments' in fields:
+        posts = posts.prefetch_related('comments__aspects')
+    return posts
@@ -0,0 +1,310 @@
+# backend/qa_form/api/ingest.py
+from collections import Counter, defaultdict
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from ..dedup import band_buckets, content_hash, minhash, similarity
+from ..models import Post, Comment, Aspect, Source, CaptionBand
+from ..signals import posts_changed
+from .typeahead import bump_sources_version, record_source_uses
+
+
+def resolve_sources(names):
+    """
+    Map each source name to its Source row, creating missing ones, in a
+    fixed number of queries. Names are upper-cased like ``Source.save()``.
+
+    Every use of an already existing source bumps its ``usage_count``, the
+    same as the single-post update path; a source created here starts at 0
+    and counts the uses after the first. The increments are buffered and
+    written in the background (see ``typeahead.record_source_uses``).
+    """
+    uses = Counter(name.upper() for name in names)
+    if not uses:
+        return {}
+
+    sources = {source.name: source for source in Source.objects.filter(name__in=uses)}
+    missing = [name for name in uses if name not in sources]
+    if missing:
+        # bulk_create skips save(), so names must already be upper-cased;
+        # ignore_conflicts covers sources created concurrently
+        Source.objects.bulk_create(
+            [Source(name=name) for name in missing], ignore_conflicts=True
+        )
+        sources.update(
+            (source.name, source)
+            for source in Source.objects.filter(name__in=missing)
+        )
+        # bulk_create skips post_save too, so refresh the typeahead by hand
+        transaction.on_commit(bump_sources_version)
+
+    increments = {
+        source.id: uses[name] - (1 if name in missing else 0)
+        for name, source in sources.items()
+    }
+    record_source_uses(increments)
+    return sources
+
+
+def index_captions(posts):
+    """Store the LSH band buckets of the posts' captions (see ``CaptionBand``)."""
+    CaptionBand.objects.bulk_create([
+        CaptionBand(post_id=post.pk, source_id=post.source_id, bucket=bucket)
+        for post in posts
+        for bucket in band_buckets(minhash(post.caption))
+    ], batch_size=5000)
+
+
+def match_near_captions(captions):
+    """
+    Map ``index -> (user_id, source_id, caption)`` to ``index -> post id``
+    of the most similar stored caption of the same user and source, for the
+    captions that have one at QA_FORM_DEDUP_NEAR_THRESHOLD or above.
+    Candidates are the posts sharing an LSH bucket, so this costs two
+    queries for the batch.
+    """
+    if not captions:
+        return {}
+    signatures = {index: minhash(caption) for index, (_, _, caption) in captions.items()}
+    buckets = {index: band_buckets(signature) for index, signature in signatures.items()}
+    candidates = defaultdict(set)
+    bands = CaptionBand.objects.filter(
+        source_id__in={source_id for _, source_id, _ in captions.values()},
+        bucket__in={bucket for values in buckets.values() for bucket in values},
+    ).values_list('source_id', 'bucket', 'post_id')
+    for source_id, bucket, post_id in bands:
+        candidates[source_id, bucket].add(post_id)
+
+    post_ids = {post_id for ids in candidates.values() for post_id in ids}
+    stored = {
+        post_id: ((user_id, source_id), minhash(caption))
+        for post_id, user_id, source_id, caption in
+        Post.objects.filter(
+            id__in=post_ids, user_id__in={user_id for user_id, _, _ in captions.values()}
+        ).values_list('id', 'user_id', 'source_id', 'caption')
+    } if post_ids else {}
+
+    matches = {}
+    for index, (user_id, source_id, _) in captions.items():
+        scored = [
+            (similarity(signatures[index], stored[post_id][1]), -post_id)
+            for bucket in buckets[index]
+            for post_id in candidates.get((source_id, bucket), ())
+            # Buckets are per source, and may be stale if the post moved
+            if post_id in stored and stored[post_id][0] == (user_id, source_id)
+        ]
+        if scored:
+            score, post_id = max(scored)
+            if score >= settings.QA_FORM_DEDUP_NEAR_THRESHOLD:
+                matches[index] = -post_id
+    return matches
+
+
+def lock_captions(keys):
+    """
+    Make transactions writing the same ``(user_id, source_id, caption_hash)``
+    take turns until they commit, so a caption submitted twice at once is
+    still caught. Postgres advisory locks keyed on a hash of each key, taken
+    in a fixed order; other posts of the same source are not held up.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    lock_ids = sorted({
+        int.from_bytes(
+            blake2b(f'{user_id}:{source_id}:{caption_hash}'.encode(), digest_size=8).digest(),
+            'big',
+            signed=True
+        )
+        for user_id, source_id, caption_hash in keys
+    })
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT count(pg_advisory_xact_lock(lock_id)) FROM unnest(%s::bigint[]) AS lock_id',
+            [lock_ids]
+        )
+
+
+def deduplicate(user_ids, posts_data, sources, mode):
+    """
+    Plan how a batch of posts, the post at each index owned by the user at
+    the same index of ``user_ids``, is written under dedup ``mode``
+    ('merge', 'skip' or 'off', see QA_FORM_DEDUP_MODE). Returns two lists,
+    one entry per post: its target, i.e. the stored Post it duplicates or
+    the index of the post in the batch it is (its own index for a new
+    post); and the comments it adds, without those repeating a comment of
+    the target.
+
+    Posts only duplicate posts of the same user and source, so a collector
+    never gets or merges into another one's post. Exact duplicates are
+    found through the indexed caption and text hashes in a fixed number of
+    queries; with QA_FORM_DEDUP_NEAR, MinHash similarity is used as well.
+    Must run in the transaction that writes the batch.
+    """
+    targets = list(range(len(posts_data)))
+    if mode == 'off':
+        return targets, [post_data.get('comments', []) for post_data in posts_data]
+
+    near = settings.QA_FORM_DEDUP_NEAR
+    threshold = settings.QA_FORM_DEDUP_NEAR_THRESHOLD
+    keys = [
+        (user_id, sources[post_data['source'].upper()].id, content_hash(post_data['caption']))
+        for user_id, post_data in zip(user_ids, posts_data)
+    ]
+    lock_captions(keys)
+    # The oldest stored post is the one duplicates are matched to
+    stored = {
+        (post.user_id, post.source_id, post.caption_hash): post
+        for post in (
+            Post.objects
+            .filter(
+                user_id__in={user_id for user_id, _, _ in keys},
+                source_id__in={source_id for _, source_id, _ in keys},
+                caption_hash__in={caption_hash for _, _, caption_hash in keys},
+            )
+            .select_related('source', 'user')
+            .order_by('-id')
+        )
+    }
+    near_stored = {}
+    if near:
+        near_ids = match_near_captions({
+            index: (key[0], key[1], post_data['caption'])
+            for index, (key, post_data) in enumerate(zip(keys, posts_data))
+            if key not in stored
+        })
+        posts = Post.objects.select_related('source', 'user').in_bulk(set(near_ids.values()))
+        near_stored = {index: posts[post_id] for index, post_id in near_ids.items()}
+
+    first = {}
+    batch_signatures = defaultdict(list)
+    for index, key in enumerate(keys):
+        if key in stored:
+            targets[index] = stored[key]
+        elif key in first:
+            targets[index] = first[key]
+        elif index in near_stored:
+            targets[index] = near_stored[index]
+        elif near:
+            signature = minhash(posts_data[index]['caption'])
+            earlier = [
+                (similarity(signature, other), other_index)
+                for other, other_index in batch_signatures[key[:2]]
+            ]
+            if earlier and max(earlier)[0] >= threshold:
+                targets[index] = max(earlier)[1]
+            else:
+                batch_signatures[key[:2]].append((signature, index))
+        if targets[index] == index:
+            first[key] = index
+
+    # The comments already on the stored posts that get merged into
+    seen_hashes, seen_signatures = defaultdict(set), defaultdict(list)
+    merged_ids = {target.pk for target in targets if isinstance(target, Post)} if mode == 'merge' else ()
+    if merged_ids:
+        columns = ('post_id', 'text_hash', 'text') if near else ('post_id', 'text_hash')
+        for post_id, text_hash, *text in Comment.objects.filter(post_id__in=merged_ids).values_list(*columns):
+            seen_hashes['stored', post_id].add(text_hash)
+            if near:
+                seen_signatures['stored', post_id].append(minhash(text[0]))
+
+    comments = []
+    for index, post_data in enumerate(posts_data):
+        target = targets[index]
+        if mode == 'skip' and target != index:
+            comments.append([])
+            continue
+        key = ('stored', target.pk) if isinstance(target, Post) else ('new', target)
+        kept = []
+        for comment_data in post_data.get('comments', []):
+            text_hash = content_hash(comment_data['text'])
+            if text_hash in seen_hashes[key]:
+                continue
+            if near:
+                signature = minhash(comment_data['text'])
+                if any(similarity(signature, other) >= threshold for other in seen_signatures[key]):
+                    continue
+                seen_signatures[key].append(signature)
+            seen_hashes[key].add(text_hash)
+            kept.append(comment_data)
+        comments.append(kept)
+    return targets, comments
+
+
+def create_posts(user, posts_data, dedup=None):
+    """
+    Create posts with their nested comments and aspects from validated
+    ``PostSerializer`` data using one bulk insert per level. Any ids in the
+    nested data are ignored.
+
+    Duplicates are handled per ``dedup`` (QA_FORM_DEDUP_MODE by default,
+    see ``deduplicate``): a post repeating a stored one of the user, or an
+    earlier one of the batch, is not created, and in 'merge' mode its new comments are
+    added to that post instead. Returns ``(post, created)`` pairs in order,
+    where a duplicate's post is the one it was matched to.
+    """
+    mode = dedup or settings.QA_FORM_DEDUP_MODE
+    sources = resolve_sources(post_data['source'] for post_data in posts_data)
+
+    with transaction.atomic():
+        targets, comments_data = deduplicate([user.pk] * len(posts_data), posts_data, sources, mode)
+
+        new_posts = {
+            index: Post(
+                user=user,
+                source=sources[post_data['source'].upper()],
+                caption=post_data['caption'],
+                caption_hash=content_hash(post_data['caption'])
+            )
+            for index, post_data in enumerate(posts_data)
+            if targets[index] == index
+        }
+        Post.objects.bulk_create(new_posts.values())
+        posts = [new_posts[target] if isinstance(target, int) else target for target in targets]
+
+        comments, nested_data = [], []
+        for post, post_comments in zip(posts, comments_data):
+            for comment_data in post_comments:
+                comments.append(Comment(
+                    post=post,
+                    text=comment_data['text'],
+                    text_hash=content_hash(comment_data['text']),
+                    general_sentiment=comment_data['general_sentiment']
+                ))
+                nested_data.append(comment_data)
+        Comment.objects.bulk_create(comments)
+
+        Aspect.objects.bulk_create([
+            Aspect(
+                comment=comment,
+                aspect_name=aspect_data['aspect_name'],
+                aspect_text=aspect_data.get('aspect_text', ''),
+                sentiment=aspect_data['sentiment']
+            )
+            for comment, comment_data in zip(comments, nested_data)
+            for aspect_data in comment_data.get('aspects', [])
+        ])
+
+        if mode != 'off' and settings.QA_FORM_DEDUP_NEAR:
+            index_captions(new_posts.values())
+        merged = {
+            post.pk: post.user_id
+            for post, target, post_comments in zip(posts, targets, comments_data)
+            if isinstance(target, Post) and post_comments
+        }
+        if merged:
+            notify_merged(merged)
+
+    return [(post, target == index) for index, (post, target) in enumerate(zip(posts, targets))]
+
+
+def notify_merged(merged):
+    """Mark stored posts that got merged comments (``post id -> owner id``) as changed."""
+    Post.touch(list(merged))
+
+    # Their collectors may not be the user writing
+    def notify():
+        for user_id in set(merged.values()):
+            posts_changed.send(sender=Post, user_id=user_id)
+    transaction.on_commit(notify)
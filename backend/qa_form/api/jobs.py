@@ -0,0 +1,198 @@
+# backend/qa_form/api/jobs.py
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Post, Comment, ExportJob, Tombstone
+from .exports import DATASET_FORMATS, iter_csv_gz, iter_dataset
+
+logger = logging.getLogger(__name__)
+
+# Export job formats: format name -> (file name, content type)
+JOB_FORMATS = {
+    'csv': ('qa_data_export.csv.gz', 'application/gzip'),
+    **{
+        file_format: (f'qa_dataset.{extension}', content_type)
+        for file_format, (extension, content_type) in DATASET_FORMATS.items()
+    },
+}
+
+
+def data_changed_since(user, moment):
+    """Whether any of the user's posts (or their children) changed after ``moment``."""
+    # Comment and aspect writes touch their post, deletions leave a tombstone
+    return (
+        Post.objects.filter(user=user, updated_at__gt=moment).exists()
+        or Tombstone.objects.filter(user=user, deleted_at__gt=moment).exists()
+    )
+
+
+def submit_export(user, file_format):
+    """
+    Return the job that will export the user's posts in ``file_format`` and
+    whether it was just created. An identical job is reused when it is
+    still queued, or when it is running or finished and none of the user's
+    data changed since it started; otherwise a new job is queued.
+
+    Like the delta export cursor, "since it started" reaches back
+    QA_FORM_CHANGES_OVERLAP_SECONDS: a write stamped just before the start
+    may have committed after the job read the data.
+    """
+    jobs = ExportJob.objects.filter(user=user, format=file_format)
+    queued = jobs.filter(status='queued').first()
+    if queued is not None:
+        return queued, False
+
+    latest = (
+        jobs
+        .filter(Q(status='running') | Q(status='succeeded', expires_at__gt=timezone.now()))
+        .order_by('-started_at')
+        .first()
+    )
+    overlap = timedelta(seconds=settings.QA_FORM_CHANGES_OVERLAP_SECONDS)
+    if latest is not None and not data_changed_since(user, latest.started_at - overlap):
+        return latest, False
+
+    try:
+        with transaction.atomic():
+            return ExportJob.objects.create(user=user, format=file_format), True
+    except IntegrityError:
+        # An identical request queued its job first; a worker may have
+        # claimed it since, and if it even finished, start over
+        job = jobs.filter(status__in=('queued', 'running')).order_by('-created_at').first()
+        if job is None:
+            return submit_export(user, file_format)
+        return job, False
+
+
+def claim_export_job(worker):
+    """
+    Take the oldest queued job for ``worker`` and mark it running, or return
+    None if the queue is empty. Like the review queue, concurrent workers
+    skip the rows another one has locked instead of waiting for them.
+    """
+    with transaction.atomic():
+        job = (
+            ExportJob.objects
+            .filter(status='queued')
+            .order_by('created_at', 'id')
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = 'running'
+        job.worker = worker
+        job.started_at = job.heartbeat_at = now
+        job.attempts += 1
+        job.rows_done = 0
+        job.save(update_fields=['status', 'worker', 'started_at', 'heartbeat_at', 'attempts', 'rows_done'])
+    return job
+
+
+def running(job):
+    """The job's row, as long as it is still the run ``job`` was claimed for."""
+    # A worker presumed dead may come back after its job was handed on
+    return ExportJob.objects.filter(pk=job.pk, status='running', started_at=job.started_at)
+
+
+def run_export_job(job):
+    """Write the export of a claimed job to storage and record the outcome."""
+    posts = Post.objects.filter(user=job.user_id)
+    job.rows_total = Comment.objects.filter(post__user=job.user_id).count()
+    running(job).update(rows_total=job.rows_total)
+
+    def progress(rows):
+        job.rows_done += rows
+        running(job).update(rows_done=job.rows_done, heartbeat_at=timezone.now())
+
+    file_name, _ = JOB_FORMATS[job.format]
+    try:
+        if job.format == 'csv':
+            chunks = iter_csv_gz(posts, progress=progress)
+        else:
+            chunks = iter_dataset(posts, job.format, progress=progress)
+        # Spooled to a local temporary file, then handed to the storage
+        with tempfile.TemporaryFile() as output:
+            for chunk in chunks:
+                output.write(chunk)
+            job.size = output.tell()
+            output.seek(0)
+            job.file.save(f'{job.pk}-{file_name}', File(output), save=False)
+    except Exception as error:
+        logger.exception('Export job %s failed', job.pk)
+        if isinstance(error, ImportError):
+            error = f'The {job.format} format requires pyarrow to be installed'
+        job.status, job.error = 'failed', str(error)
+    else:
+        job.status = 'succeeded'
+
+    job.finished_at = timezone.now()
+    job.expires_at = job.finished_at + timedelta(seconds=settings.QA_FORM_EXPORT_JOB_TTL)
+    finished = running(job).update(
+        status=job.status,
+        error=job.error,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        file=job.file.name,
+        size=job.size,
+        rows_done=job.rows_done,
+    )
+    if not finished and job.file:
+        job.file.delete(save=False)
+    return job
+
+
+def requeue_stale_export_jobs():
+    """
+    Hand running jobs whose worker stopped reporting progress back to the
+    queue, or fail them once they used up their attempts. Returns the
+    number of jobs requeued and failed.
+    """
+    stale = ExportJob.objects.filter(
+        status='running',
+        heartbeat_at__lt=timezone.now() - timedelta(seconds=settings.QA_FORM_EXPORT_JOB_STALE_SECONDS),
+    )
+    requeued = failed = 0
+    for job in stale.only('pk', 'attempts'):
+        # Conditional on the heartbeat, in case the worker came back
+        job_stale = stale.filter(pk=job.pk)
+        if job.attempts >= settings.QA_FORM_EXPORT_JOB_MAX_ATTEMPTS:
+            now = timezone.now()
+            failed += job_stale.update(
+                status='failed',
+                error='The worker running the export stopped responding',
+                finished_at=now,
+                expires_at=now + timedelta(seconds=settings.QA_FORM_EXPORT_JOB_TTL),
+            )
+            continue
+        try:
+            with transaction.atomic():
+                requeued += job_stale.update(status='queued', worker='')
+        except IntegrityError:
+            # An identical job was queued meanwhile and will do the work
+            now = timezone.now()
+            failed += job_stale.update(
+                status='failed',
+                error='Superseded by a newer identical export',
+                finished_at=now,
+                expires_at=now,
+            )
+    return requeued, failed
+
+
+def expire_export_jobs():
+    """Delete the jobs past their expiry, with their files. Returns how many."""
+    expired = list(ExportJob.objects.filter(expires_at__lte=timezone.now()))
+    for job in expired:
+        if job.file:
+            job.file.delete(save=False)
+    ExportJob.objects.filter(pk__in=[job.pk for job in expired]).delete()
+    return len(expired)
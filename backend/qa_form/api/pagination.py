@@ -0,0 +1,19 @@
+# backend/qa_form/api/pagination.py
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id): each page is an index range scan
+    from the cursor position, so deep pages cost the same as the first one.
+    """
+    ordering = ('created_at', 'id')
+    page_size = settings.QA_FORM_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.QA_FORM_MAX_PAGE_SIZE
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    """Keyset pagination for models without a created_at column."""
+    ordering = ('id',)
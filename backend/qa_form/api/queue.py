@@ -0,0 +1,106 @@
+# backend/qa_form/api/queue.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Post
+
+
+def is_reviewer(user):
+    """Reviewers work the queue of every collector; others only their own."""
+    return user.is_staff or user.groups.filter(name=settings.QA_FORM_REVIEWER_GROUP).exists()
+
+
+def lease_expiry():
+    return timezone.now() + timedelta(seconds=settings.QA_FORM_QUEUE_LEASE_SECONDS)
+
+
+def unclaimed():
+    """Posts nobody holds a live lease on; expired leases count as free."""
+    return Q(claimed_by__isnull=True) | Q(claim_expires_at__lte=timezone.now())
+
+
+def held_by(user):
+    return Q(claimed_by=user, claim_expires_at__gt=timezone.now())
+
+
+def lease_update(claimed_by, claim_expires_at):
+    """
+    Update arguments that set a lease. The lease is part of the post's
+    representation, so like any other write it bumps the version and
+    updated_at the ETags and delta exports are derived from.
+    """
+    return {
+        'claimed_by': claimed_by,
+        'claim_expires_at': claim_expires_at,
+        'version': F('version') + 1,
+        'updated_at': timezone.now(),
+    }
+
+
+def reviewable_posts(user):
+    """The user's own posts plus the ones they hold a live lease on."""
+    return Post.objects.filter(Q(user=user) | held_by(user))
+
+
+def claim_posts(user, count, collector=None):
+    """
+    Give ``user`` a batch of up to ``count`` unreviewed posts: the ones they
+    already hold, renewed, topped up with the oldest unclaimed ones.
+
+    Candidates are picked with SELECT ... FOR UPDATE SKIP LOCKED, so
+    concurrent reviewers each lock and get different rows instead of
+    waiting on each other, and the row locks only last for this short
+    transaction; the lease itself is the claimed_by/claim_expires_at pair.
+    Returns the ids of the batch and the lease expiry.
+    """
+    expires_at = lease_expiry()
+    with transaction.atomic():
+        held = list(
+            Post.objects
+            .filter(held_by(user), status='unreviewed')
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)[:count]
+        )
+
+        candidates = Post.objects.filter(unclaimed(), status='unreviewed')
+        if not is_reviewer(user):
+            candidates = candidates.filter(user=user)
+        elif collector is not None:
+            candidates = candidates.filter(user__username=collector)
+        new = list(
+            candidates
+            .order_by('created_at', 'id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:count - len(held)]
+        )
+
+        Post.objects.filter(id__in=held + new).update(**lease_update(user, expires_at))
+    return held + new, expires_at
+
+
+def renew_claims(user, post_ids=None):
+    """
+    Extend the user's live leases (all of them, or ``post_ids``) and return
+    the ids renewed with their new expiry. A lease that already expired
+    can't be renewed, since someone else may have claimed the post since.
+    """
+    claims = Post.objects.filter(held_by(user), status='unreviewed')
+    if post_ids is not None:
+        claims = claims.filter(id__in=post_ids)
+    expires_at = lease_expiry()
+    with transaction.atomic():
+        renewed = list(claims.select_for_update().values_list('id', flat=True))
+        Post.objects.filter(id__in=renewed).update(**lease_update(user, expires_at))
+    return renewed, expires_at
+
+
+def release_claims(user, post_ids=None):
+    """Hand the user's leases (all of them, or ``post_ids``) back to the queue."""
+    claims = Post.objects.filter(claimed_by=user)
+    if post_ids is not None:
+        claims = claims.filter(id__in=post_ids)
+    return claims.update(**lease_update(None, None))
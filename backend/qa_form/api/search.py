@@ -0,0 +1,111 @@
+# backend/qa_form/api/search.py
+from html import escape
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef
+
+from ..models import Post, Comment, Aspect
+
+# Must match the configuration of the search_vector triggers (migration 0005)
+SEARCH_CONFIG = 'simple'
+
+SEARCH_TARGETS = ('comments', 'posts', 'aspects')
+
+# ts_headline wraps hits in these control characters, which scraped text
+# does not contain; they become <mark></mark> once the rest is escaped
+HIT_START, HIT_STOP = '\x02', '\x03'
+
+
+def search_comments(user, query, filters):
+    comments = Comment.objects.filter(post__user=user, search_vector=query)
+    if 'source' in filters:
+        comments = comments.filter(post__source__name=filters['source'])
+    if 'status' in filters:
+        comments = comments.filter(post__status=filters['status'])
+    if 'sentiment' in filters:
+        comments = comments.filter(general_sentiment=filters['sentiment'])
+    if 'aspect_name' in filters:
+        comments = comments.filter(Exists(Aspect.objects.filter(
+            comment=OuterRef('pk'), aspect_name=filters['aspect_name']
+        )))
+    return comments, 'text', ['id', 'post_id', 'text', 'general_sentiment'], {
+        'caption': F('post__caption'),
+        'source_name': F('post__source__name'),
+        'status': F('post__status'),
+    }
+
+
+def search_posts(user, query, filters):
+    posts = Post.objects.filter(user=user, search_vector=query)
+    if 'source' in filters:
+        posts = posts.filter(source__name=filters['source'])
+    if 'status' in filters:
+        posts = posts.filter(status=filters['status'])
+    if 'sentiment' in filters:
+        posts = posts.filter(Exists(Comment.objects.filter(
+            post=OuterRef('pk'), general_sentiment=filters['sentiment']
+        )))
+    if 'aspect_name' in filters:
+        posts = posts.filter(Exists(Aspect.objects.filter(
+            comment__post=OuterRef('pk'), aspect_name=filters['aspect_name']
+        )))
+    return posts, 'caption', ['id', 'caption', 'status', 'created_at'], {
+        'source_name': F('source__name'),
+    }
+
+
+def search_aspects(user, query, filters):
+    aspects = Aspect.objects.filter(comment__post__user=user, search_vector=query)
+    if 'source' in filters:
+        aspects = aspects.filter(comment__post__source__name=filters['source'])
+    if 'status' in filters:
+        aspects = aspects.filter(comment__post__status=filters['status'])
+    if 'sentiment' in filters:
+        aspects = aspects.filter(sentiment=filters['sentiment'])
+    if 'aspect_name' in filters:
+        aspects = aspects.filter(aspect_name=filters['aspect_name'])
+    return aspects, 'aspect_text', ['id', 'comment_id', 'aspect_name', 'aspect_text', 'sentiment'], {
+        'post_id': F('comment__post_id'),
+        'comment_text': F('comment__text'),
+    }
+
+
+SEARCHES = {
+    'comments': search_comments,
+    'posts': search_posts,
+    'aspects': search_aspects,
+}
+
+
+def search(user, text, target='comments', filters=None, limit=50):
+    """
+    Full-text search over the user's posts, comments or aspects.
+
+    ``text`` uses web search syntax ("quoted phrases", or, -excluded). Each
+    target is matched against its own GIN-indexed ``search_vector``, then
+    narrowed by the ``source``, ``status``, ``sentiment`` and
+    ``aspect_name`` filters. Returns the ``limit`` best ranked rows, each
+    with a ``headline`` of the matched text: an HTML-escaped fragment in
+    which hits are wrapped in <mark></mark>.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    queryset, text_field, fields, related = SEARCHES[target](user, query, filters or {})
+    rows = list(
+        queryset
+        .annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=SearchHeadline(
+                text_field, query, config=SEARCH_CONFIG,
+                start_sel=HIT_START, stop_sel=HIT_STOP
+            ),
+        )
+        .order_by('-rank', 'id')
+        .values(*fields, 'rank', 'headline', **related)[:limit]
+    )
+    for row in rows:
+        row['headline'] = (
+            escape(row['headline'] or '')
+            .replace(HIT_START, '<mark>')
+            .replace(HIT_STOP, '</mark>')
+        )
+    return rows
@@ -1,14 +1,38 @@
 # backend/qa_form/api/serializers.py
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from django.contrib.auth.models import User
-from ..models import Post, Comment, Aspect, Source
+from ..dedup import content_hash
+from ..metrics import timed_serialization
+from ..models import Post, Comment, Aspect, Source, Tombstone, ExportJob
+from .ingest import create_posts
+from .search import SEARCH_TARGETS
+from .typeahead import record_source_uses
+from django.conf import settings
 from django.db import models, transaction
+from django.urls import reverse
+from django.utils import timezone
 
-class AspectSerializer(serializers.ModelSerializer):
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+class TimedDataMixin:
+    """Count building ``.data`` in the request's serializer time metric."""
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+class AspectSerializer(TimedDataMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
 
     class Meta:
         model = Aspect
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'aspect_name', 'aspect_text', 'sentiment']
 
     def update(self, instance, validated_data):
@@ -18,14 +42,103 @@ class AspectSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class CommentSerializer(serializers.ModelSerializer):
+def save_nested_aspects(comments_with_aspects, existing_comment_ids, user_id):
+    """
+    Bring the aspects of several comments in line with the submitted data
+    using one query per operation, whatever the number of rows.
+
+    ``comments_with_aspects`` is a list of ``(comment, aspects_data)`` pairs.
+    Aspects of comments in ``existing_comment_ids`` are diffed by id: known
+    ids are updated, the rest are created and any aspect left out is deleted.
+    Aspects of new comments are simply created.
+    """
+    existing_aspects = {
+        aspect.id: aspect
+        for aspect in Aspect.objects.filter(comment_id__in=existing_comment_ids)
+    } if existing_comment_ids else {}
+
+    now = timezone.now()
+    to_update, to_create = [], []
+    for comment, aspects_data in comments_with_aspects:
+        for aspect_data in aspects_data:
+            aspect_id = aspect_data.get('id')
+            aspect = existing_aspects.get(aspect_id) if aspect_id else None
+            if aspect is not None and aspect.comment_id == comment.id:
+                # Update existing aspect
+                aspect.aspect_name = aspect_data.get('aspect_name', aspect.aspect_name)
+                aspect.aspect_text = aspect_data.get('aspect_text', aspect.aspect_text)
+                aspect.sentiment = aspect_data.get('sentiment', aspect.sentiment)
+                aspect.updated_at = now
+                to_update.append(aspect)
+            else:
+                # Create new aspect
+                to_create.append(Aspect(comment=comment, **aspect_data))
+
+    Aspect.objects.bulk_update(to_update, ['aspect_name', 'aspect_text', 'sentiment', 'updated_at'])
+    Aspect.objects.bulk_create(to_create)
+
+    # Remove aspects that weren't included in the update
+    kept_aspects = {aspect.id for aspect in to_update}
+    removed_aspects = [aspect_id for aspect_id in existing_aspects
+                       if aspect_id not in kept_aspects]
+    if removed_aspects:
+        Aspect.objects.filter(id__in=removed_aspects).delete()
+        Tombstone.record('aspect', ((aspect_id, user_id) for aspect_id in removed_aspects))
+
+
+def save_nested_comments(post, comments_data):
+    """
+    Bring the comments of ``post`` (and their aspects) in line with the
+    submitted data with bulk operations: known ids are updated, the rest are
+    created and any comment left out is deleted.
+    """
+    existing_comments = {comment.id: comment for comment in post.comments.all()}
+
+    now = timezone.now()
+    to_update, to_create, comments_with_aspects = [], [], []
+    for comment_data in comments_data:
+        aspects_data = comment_data.get('aspects', [])
+        comment_id = comment_data.get('id')
+        if comment_id and comment_id in existing_comments:
+            # Update existing comment
+            comment = existing_comments[comment_id]
+            comment.text = comment_data.get('text', comment.text)
+            comment.text_hash = content_hash(comment.text)
+            comment.general_sentiment = comment_data.get('general_sentiment', comment.general_sentiment)
+            comment.updated_at = now
+            to_update.append(comment)
+        else:
+            # Create new comment
+            comment = Comment(post=post, **{k: v for k, v in comment_data.items()
+                                            if k != 'aspects'})
+            comment.text_hash = content_hash(comment.text)
+            to_create.append(comment)
+        comments_with_aspects.append((comment, aspects_data))
+
+    Comment.objects.bulk_update(to_update, ['text', 'text_hash', 'general_sentiment', 'updated_at'])
+    Comment.objects.bulk_create(to_create)
+
+    # Remove comments that weren't included in the update
+    kept_comments = {comment.id for comment in to_update}
+    removed_comments = [comment_id for comment_id in existing_comments
+                        if comment_id not in kept_comments]
+    if removed_comments:
+        Comment.objects.filter(id__in=removed_comments).delete()
+        Tombstone.record('comment', ((comment_id, post.user_id)
+                                     for comment_id in removed_comments))
+
+    save_nested_aspects(comments_with_aspects, list(kept_comments), post.user_id)
+
+class CommentSerializer(TimedDataMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
     aspects = AspectSerializer(many=True)
 
     class Meta:
         model = Comment
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'text', 'general_sentiment', 'created_at', 'aspects']
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         # Handle aspects update
         aspects_data = validated_data.pop('aspects', [])
@@ -35,35 +148,35 @@ class CommentSerializer(serializers.ModelSerializer):
         instance.general_sentiment = validated_data.get('general_sentiment', instance.general_sentiment)
         instance.save()
 
-        # Track existing aspects
-        existing_aspects = {aspect.id: aspect for aspect in instance.aspects.all()}
-
-        # Process aspects
-        updated_aspects = []
-        for aspect_data in aspects_data:
-            aspect_id = aspect_data.get('id')
-            if aspect_id and aspect_id in existing_aspects:
-                # Update existing aspect
-                aspect = existing_aspects[aspect_id]
-                AspectSerializer().update(aspect, aspect_data)
-                updated_aspects.append(aspect.id)
-            else:
-                # Create new aspect
-                aspect = Aspect.objects.create(comment=instance, **aspect_data)
-                updated_aspects.append(aspect.id)
-
-        # Remove aspects that weren't included in the update
-        instance.aspects.exclude(id__in=updated_aspects).delete()
+        save_nested_aspects([(instance, aspects_data)], [instance.id], instance.post.user_id)
 
         return instance
 
-class SourceSerializer(serializers.ModelSerializer):
+class SourceSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Source
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'name', 'usage_count']
         read_only_fields = ['usage_count']
 
-class PostSerializer(serializers.ModelSerializer):
+class VersionConflict(APIException):
+    """The post changed (or was reviewed) since the client read it."""
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'conflict'
+
+    def __init__(self, post_id, detail):
+        current = (
+            Post.objects
+            .filter(pk=post_id)
+            .values('version', 'status', 'reviewed_by', 'reviewed_at')
+            .first()
+        )
+        super().__init__(detail)
+        # Keep the current values typed instead of coerced to error strings
+        self.detail = {'detail': self.detail, 'current': current}
+
+
+class PostSerializer(TimedDataMixin, serializers.ModelSerializer):
     comments = CommentSerializer(many=True)
     source = serializers.CharField()
     user = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -71,58 +184,159 @@ class PostSerializer(serializers.ModelSerializer):
     status = serializers.CharField(read_only=True)
     reviewed_by = serializers.PrimaryKeyRelatedField(read_only=True)
     reviewed_at = serializers.DateTimeField(read_only=True)
+    claimed_by = serializers.PrimaryKeyRelatedField(read_only=True)
+    claim_expires_at = serializers.DateTimeField(read_only=True)
+    # Sent back on updates to make them conditional on the version read
+    version = serializers.IntegerField(required=False)
+    # Annotated by fieldsets.select_post_fields when asked for
+    comment_count = serializers.IntegerField(read_only=True)
+    aspect_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'caption', 'source', 'created_at', 'comments', 'user',
-                 'username', 'status', 'reviewed_by', 'reviewed_at']
+                 'username', 'status', 'reviewed_by', 'reviewed_at', 'claimed_by',
+                 'claim_expires_at', 'version', 'comment_count', 'aspect_count']
         read_only_fields = ['user', 'username']
 
+    def __init__(self, *args, fields=None, **kwargs):
+        # ``fields`` restricts the representation to those field names (see
+        # fieldsets.parse_post_fields); by default every field but the counts
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            fields = [name for name in self.fields if name not in ('comment_count', 'aspect_count')]
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
     def get_username(self, obj):
         return obj.user.username if obj.user else None
 
+    @transaction.atomic
+    def create(self, validated_data):
+        user = validated_data.pop('user')
+        post, created = create_posts(user, [validated_data])[0]
+        # A duplicate is answered with the post it was matched to
+        self.duplicate = not created
+        return post
+
     @transaction.atomic
     def update(self, instance, validated_data):
         # Handle comments update
         comments_data = validated_data.pop('comments', [])
+        expected_version = validated_data.pop('version', instance.version)
 
         # Update source if provided
         if 'source' in validated_data:
-            source_name = validated_data.pop('source').upper()
+            source_name = validated_data['source'].upper()
             source, created = Source.objects.get_or_create(name=source_name)
             if not created:
-                source.usage_count = models.F('usage_count') + 1
-                source.save()
-            instance.source = source
+                # Buffered instead of saving the source on every post update
+                record_source_uses({source.id: 1})
+            validated_data['source'] = source
+
+        if 'caption' in validated_data:
+            validated_data['caption_hash'] = content_hash(validated_data['caption'])
 
         # Update other post fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
 
-        # Track existing comments
-        existing_comments = {comment.id: comment for comment in instance.comments.all()}
-
-        # Process comments
-        updated_comments = []
-        for comment_data in comments_data:
-            comment_id = comment_data.get('id')
-            if comment_id and comment_id in existing_comments:
-                # Update existing comment
-                comment = existing_comments[comment_id]
-                CommentSerializer().update(comment, comment_data)
-                updated_comments.append(comment.id)
-            else:
-                # Create new comment
-                comment_data['post'] = instance
-                comment = Comment.objects.create(**{k: v for k, v in comment_data.items()
-                                                  if k != 'aspects'})
-                # Handle aspects for new comment
-                for aspect_data in comment_data.get('aspects', []):
-                    Aspect.objects.create(comment=comment, **aspect_data)
-                updated_comments.append(comment.id)
-
-        # Remove comments that weren't included in the update
-        instance.comments.exclude(id__in=updated_comments).delete()
+        # Write only the changed columns, and only if nobody else changed the
+        # post since the client read it (and, for non-staff, reviewed it).
+        # Concurrent writers block on the row until this transaction ends and
+        # then match no row, instead of overwriting each other.
+        conditions = {'version': expected_version}
+        request = self.context.get('request')
+        if request is None or not request.user.is_staff:
+            conditions['status'] = 'unreviewed'
+        now = timezone.now()
+        updated = Post.objects.filter(pk=instance.pk, **conditions).update(
+            **validated_data, version=models.F('version') + 1, updated_at=now
+        )
+        if not updated:
+            raise VersionConflict(instance.pk, 'The post was changed or reviewed by someone else')
+        instance.version, instance.updated_at = expected_version + 1, now
+
+        save_nested_comments(instance, comments_data)
 
         return instance
+
+class SearchParamsSerializer(serializers.Serializer):
+    """Query parameters of the search endpoint."""
+    q = serializers.CharField()
+    target = serializers.ChoiceField(choices=SEARCH_TARGETS, default='comments')
+    source = serializers.CharField(required=False)
+    status = serializers.ChoiceField(choices=Post.STATUS_CHOICES, required=False)
+    sentiment = serializers.ChoiceField(choices=Comment.SENTIMENT_CHOICES, required=False)
+    aspect_name = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.QA_FORM_MAX_PAGE_SIZE,
+        default=settings.QA_FORM_PAGE_SIZE
+    )
+
+    def validate_source(self, value):
+        # Source names are stored upper-cased
+        return value.upper()
+
+class AnalyticsParamsSerializer(serializers.Serializer):
+    """
+    Query parameters of the analytics endpoints. ``group_by`` is a comma
+    separated list of the dimensions passed in the serializer context.
+    """
+    group_by = serializers.CharField()
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    source = serializers.CharField(required=False)
+    aspect_name = serializers.CharField(required=False)
+    sentiment = serializers.ChoiceField(choices=Aspect.SENTIMENT_CHOICES, required=False)
+    collector = serializers.CharField(required=False)
+
+    def validate_group_by(self, value):
+        group_by = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in group_by if name not in self.context['dimensions']]
+        if unknown or not group_by:
+            raise serializers.ValidationError(
+                f"Choose from: {', '.join(self.context['dimensions'])}"
+            )
+        return list(dict.fromkeys(group_by))
+
+    def validate_source(self, value):
+        return value.upper()
+
+class QueueClaimSerializer(serializers.Serializer):
+    """Body of a review queue claim."""
+    count = serializers.IntegerField(
+        min_value=1, max_value=settings.QA_FORM_QUEUE_MAX_CLAIM, default=10
+    )
+    collector = serializers.CharField(required=False)
+
+class QueueLeaseSerializer(serializers.Serializer):
+    """Body of a lease renewal or release; without ``ids``, every lease held."""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """An export job; clients submit the ``format`` and poll the rest."""
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'format', 'status', 'progress', 'rows_done', 'rows_total', 'size',
+                  'error', 'created_at', 'started_at', 'finished_at', 'expires_at', 'download_url']
+        read_only_fields = [field for field in fields if field != 'format']
+
+    def get_progress(self, obj):
+        # Share of the comments written, from 0 to 1
+        if obj.status == 'succeeded':
+            return 1.0
+        if not obj.rows_total:
+            return 0.0
+        return round(min(obj.rows_done / obj.rows_total, 1.0), 3)
+
+    def get_download_url(self, obj):
+        if obj.status != 'succeeded':
+            return None
+        url = reverse('api:exports-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
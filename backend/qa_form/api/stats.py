@@ -0,0 +1,90 @@
+# backend/qa_form/api/stats.py
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from ..models import Post, Comment, Source
+
+
+def dashboard_stats_key(user_id, day):
+    # The day is part of the key because lastSevenDays moves at midnight
+    return f'qa_form:dashboard_stats:{user_id}:{day.isoformat()}'
+
+
+def get_dashboard_stats(user):
+    """
+    Return the dashboard statistics of ``user`` from the cache, computing
+    them on a miss. Entries are dropped whenever the user's posts or comments
+    change and expire after QA_FORM_DASHBOARD_STATS_TTL seconds at the latest.
+    """
+    key = dashboard_stats_key(user.id, datetime.now().date())
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(user)
+        cache.set(key, stats, settings.QA_FORM_DASHBOARD_STATS_TTL)
+    return stats
+
+
+def invalidate_dashboard_stats(user_id):
+    cache.delete(dashboard_stats_key(user_id, datetime.now().date()))
+
+
+def compute_dashboard_stats(user):
+    """Run the dashboard aggregates for ``user``; see get_dashboard_stats."""
+    # Get user's posts
+    user_posts = Post.objects.filter(user=user)
+
+    # Get distinct sources for this user
+    user_sources = (
+        Source.objects
+        .filter(post__user=user)
+        .distinct()  # This ensures we only count each source once
+    )
+
+    # Get top sources with correct counts
+    top_sources = (
+        Source.objects
+        .filter(post__user=user)
+        .annotate(count=Count('post'))
+        .order_by('-count')[:5]
+        .values('name', 'count')
+    )
+
+    # Calculate date range
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=6)
+
+    # Get daily post counts
+    daily_counts = (
+        user_posts
+        .filter(created_at__date__gte=start_date)
+        .annotate(date=TruncDate('created_at'))
+        .values('date')
+        .annotate(count=Count('id'))
+        .order_by('date')
+    )
+
+    # Fill in missing dates
+    date_counts = {
+        (start_date + timedelta(days=i)): 0
+        for i in range(7)
+    }
+    for entry in daily_counts:
+        date_counts[entry['date']] = entry['count']
+
+    return {
+        'totalPosts': user_posts.count(),
+        'totalComments': Comment.objects.filter(post__user=user).count(),
+        'sourcesCount': user_sources.count(),
+        'lastSevenDays': [
+            {
+                'date': date.strftime('%Y-%m-%d'),
+                'count': count
+            }
+            for date, count in date_counts.items()
+        ],
+        'topSources': list(top_sources)
+    }
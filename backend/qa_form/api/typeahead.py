@@ -0,0 +1,157 @@
+# backend/qa_form/api/typeahead.py
+import atexit
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, models, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from ..models import Source
+
+SOURCES_VERSION_KEY = 'qa_form:sources_version'
+
+IndexedSource = namedtuple('IndexedSource', ['name', 'usage_count', 'id'])
+
+
+def bump_sources_version():
+    """Tell every process that its source index is out of date."""
+    cache.set(SOURCES_VERSION_KEY, time.time_ns(), None)
+    # This process needn't wait for its next check
+    source_index.checked_at = 0
+
+
+class SourceIndex:
+    """
+    In-process copy of all sources sorted by name, so prefix searches are a
+    bisect instead of a database query.
+
+    The index is reloaded when the shared ``SOURCES_VERSION_KEY`` changes
+    (sources created, renamed or deleted) and at least every
+    QA_FORM_SOURCE_INDEX_MAX_AGE seconds, which is how flushed usage counts
+    reach the ranking and bounds staleness when the cache is not shared
+    between processes. The version is only looked up every
+    QA_FORM_SOURCE_INDEX_CHECK_SECONDS, so most keystrokes are answered
+    without a cache round trip.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.names = []
+        self.rows = []
+        self.version = None
+        self.loaded_at = 0
+        self.checked_at = 0
+
+    def refresh(self):
+        now = time.monotonic()
+        if (
+            now - self.checked_at < settings.QA_FORM_SOURCE_INDEX_CHECK_SECONDS
+            and now - self.loaded_at < settings.QA_FORM_SOURCE_INDEX_MAX_AGE
+        ):
+            return
+        version = cache.get(SOURCES_VERSION_KEY)
+        if version is None:
+            bump_sources_version()
+            version = cache.get(SOURCES_VERSION_KEY)
+        self.checked_at = now
+        if self.is_current(version):
+            return
+
+        with self.lock:
+            if self.is_current(version):
+                return
+            rows = [
+                IndexedSource(*row)
+                for row in Source.objects.order_by('name').values_list('name', 'usage_count', 'id')
+            ]
+            # Swap both lists at once; searches running meanwhile keep
+            # using the previous snapshot
+            self.names, self.rows = [row.name for row in rows], rows
+            self.version, self.loaded_at = version, time.monotonic()
+
+    def is_current(self, version):
+        age = time.monotonic() - self.loaded_at
+        return version == self.version and age < settings.QA_FORM_SOURCE_INDEX_MAX_AGE
+
+    def search(self, prefix, limit=5):
+        """Return the ``limit`` most used sources whose name starts with ``prefix``."""
+        self.refresh()
+        names, rows = self.names, self.rows
+        start = bisect_left(names, prefix)
+        end = bisect_right(names, prefix + '\U0010ffff', lo=start)
+        return heapq.nlargest(limit, rows[start:end], key=lambda row: row.usage_count)
+
+
+class SourceUsageBuffer:
+    """
+    Collect ``usage_count`` increments in memory and write them in one
+    UPDATE every QA_FORM_SOURCE_USAGE_FLUSH_SECONDS from a background
+    thread, instead of one write per post saved. Pending increments are
+    flushed at exit; a crashed process loses at most one interval of them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.timer = None
+        atexit.register(self.flush)
+
+    def add(self, increments):
+        with self.lock:
+            self.pending.update(increments)
+            if self.timer is None:
+                self.timer = threading.Timer(
+                    settings.QA_FORM_SOURCE_USAGE_FLUSH_SECONDS, self.flush_in_background
+                )
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread has its own connections; don't leak them
+            connections.close_all()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = +self.pending, Counter()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pending:
+            return
+
+        try:
+            Source.objects.filter(id__in=pending).update(
+                usage_count=Case(
+                    *[When(id=source_id, then=F('usage_count') + count)
+                      for source_id, count in pending.items()],
+                    output_field=models.IntegerField()
+                ),
+                last_used=timezone.now()
+            )
+        except DatabaseError:
+            # Keep the increments for the next flush
+            self.add(pending)
+            raise
+
+
+source_index = SourceIndex()
+usage_buffer = SourceUsageBuffer()
+
+
+def record_source_uses(increments):
+    """
+    Queue ``{source_id: count}`` usage increments. They are only queued once
+    the current transaction commits, so rolled back writes don't count.
+    """
+    increments = {source_id: count for source_id, count in increments.items() if count}
+    if increments:
+        transaction.on_commit(lambda: usage_buffer.add(increments))
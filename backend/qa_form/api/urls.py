@@ -1,7 +1,10 @@
 # backend/qa_form/api/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CommentViewSet, AspectViewSet, SourceViewSet
+from .views import (
+    PostViewSet, CommentViewSet, AspectViewSet, SourceViewSet, SearchViewSet,
+    AnalyticsViewSet, ReviewQueueViewSet, MetricsViewSet, ExportJobViewSet,
+)
 # from .auth import login_view, logout_view, user_view, get_csrf_token
 
 router = DefaultRouter()
@@ -9,6 +12,11 @@ router.register(r'posts', PostViewSet)
 router.register(r'comments', CommentViewSet)
 router.register(r'aspects', AspectViewSet)
 router.register(r'sources', SourceViewSet)
+router.register(r'queue', ReviewQueueViewSet, basename='queue')
+router.register(r'exports', ExportJobViewSet, basename='exports')
+router.register(r'search', SearchViewSet, basename='search')
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+router.register(r'metrics', MetricsViewSet, basename='metrics')
 
 app_name = 'api'
 
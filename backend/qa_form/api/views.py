@@ -1,26 +1,163 @@
 # backend/qa_form/api/views.py
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, SAFE_METHODS
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from django.http import HttpResponse
-from datetime import datetime, timedelta
-from django.db.models import Count
-from django.db.models.functions import TruncDate
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.db.models import F, Q, prefetch_related_objects
 from django.utils import timezone
-from django.db import transaction
-import json
-import csv
-from ..models import Post, Comment, Aspect, Source
-from .serializers import PostSerializer, CommentSerializer, AspectSerializer, SourceSerializer
+from django.utils.dateparse import parse_datetime
+from django.db import DatabaseError, connection, transaction
+from collections import Counter
+from datetime import timedelta
+from operator import itemgetter
+from ..db_router import pin_to_primary, route_reads
+from ..metrics import collect, timed_serialization
+from ..models import (
+    Post, Comment, Aspect, Source, Tombstone, ExportJob,
+    AspectSentimentRollup, CommentSentimentRollup, RollupRefresh,
+)
+from ..signals import posts_changed
+from .serializers import (
+    PostSerializer, CommentSerializer, AspectSerializer, SourceSerializer, SearchParamsSerializer,
+    AnalyticsParamsSerializer, QueueClaimSerializer, QueueLeaseSerializer, VersionConflict,
+    ExportJobSerializer,
+)
+from .ingest import create_posts
+from .pagination import CreatedAtCursorPagination, IdCursorPagination
+from .parsers import NDJSONParser
+from .renderers import ORJSONRenderer, PrometheusRenderer
+from .exports import (
+    DATASET_FORMATS, collect_changes, decode_changes_cursor, encode_changes_cursor, iter_csv, iter_dataset,
+)
+from .conditional import etag_from_post, etag_from_posts
+from .fastpath import post_values, serialize_post_rows
+from .fieldsets import parse_post_fields, select_post_fields
+from .jobs import JOB_FORMATS, submit_export
+from .analytics import (
+    ASPECT_DIMENSIONS, ASPECT_FILTERS, SENTIMENT_DIMENSIONS, SENTIMENT_FILTERS, query_rollup
+)
+from .queue import claim_posts, held_by, release_claims, renew_claims, reviewable_posts
+from .search import search
+from .stats import get_dashboard_stats
+from .typeahead import source_index
+
+class NotifyChangesMixin:
+    """Send ``posts_changed`` for the user after every successful write."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            posts_changed.send(sender=self.__class__, user_id=request.user.id)
+        return response
+
+
+class ReplicaReadsMixin:
+    """
+    Serve safe requests from a read replica, except for the actions listed
+    in ``primary_actions``, and keep the user's reads on the primary for a
+    short while after each of their writes.
+    """
+
+    primary_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action not in self.primary_actions:
+            route_reads(request.user.id)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user.id)
+        return response
 
-class PostViewSet(viewsets.ModelViewSet):
+
+class PostViewSet(ReplicaReadsMixin, NotifyChangesMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    # The delta cursor is taken from the clock, so it must be read where
+    # every write before it is already visible
+    primary_actions = ('changes',)
+    # Actions that also reach the posts the user claimed from the review queue
+    claimed_actions = ('retrieve', 'update', 'partial_update', 'review')
+    # Actions whose representation ?fields= and ?expand= can trim
+    sparse_actions = ('list', 'retrieve', 'unreviewed', 'reviewed')
+
+    def requested_fields(self):
+        # The fields asked for, or None for the full representation
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_fields'):
+            self._fields = parse_post_fields(self.request.query_params)
+        return self._fields
+
+    def get_posts(self):
+        # The posts the action may reach, before any fetching strategy
+        if self.action in self.claimed_actions:
+            return reviewable_posts(self.request.user)
+        return Post.objects.filter(user=self.request.user)
 
     def get_queryset(self):
-        return Post.objects.filter(user=self.request.user)
+        # Fetch each relation level in one query: source and collector are
+        # joined, comments and their aspects are prefetched (unless trimmed)
+        return select_post_fields(self.get_posts(), self.requested_fields())
+
+    def list_posts(self, posts):
+        # Read-only fast path: the page is built from .values() rows rather
+        # than serializer instances, in the same shape; see fastpath.py
+        fields = self.requested_fields()
+        rows = post_values(posts, fields)
+        page = self.paginate_queryset(rows)
+        with timed_serialization():
+            data = serialize_post_rows(page if page is not None else list(rows), fields)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    # Lists, queues, the dashboard and post details answer conditional GETs
+    # with 304 Not Modified before any serialization; see conditional.py
+    @etag_from_posts
+    def list(self, request, *args, **kwargs):
+        return self.list_posts(self.get_posts())
+
+    @etag_from_post
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def refresh_nested(self, post):
+        # Replace comments prefetched before a write (or never loaded) with a
+        # fresh prefetch, so serializing the result doesn't query per comment
+        post._prefetched_objects_cache = {}
+        prefetch_related_objects([post], 'comments__aspects')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        # A duplicate of a stored post (see ingest.deduplicate) gets that post
+        # back with 200 instead of 201
+        return Response(
+            serializer.data,
+            status=status.HTTP_200_OK if serializer.duplicate else status.HTTP_201_CREATED
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+        self.refresh_nested(serializer.instance)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        Tombstone.record('post', [(instance.pk, instance.user_id)])
+        instance.delete()
 
     @transaction.atomic
     def update(self, request, *args, **kwargs):
@@ -41,9 +178,69 @@ class PostViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        self.refresh_nested(instance)
 
         return Response(serializer.data)
 
+    @action(detail=False, methods=['POST'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        # Batch ingestion: a JSON array or NDJSON stream of posts with nested
+        # comments and aspects, written in bounded-size transactions
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Expected a list of posts"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.QA_FORM_INGEST_MAX_ITEMS:
+            return Response(
+                {"detail": f"At most {settings.QA_FORM_INGEST_MAX_ITEMS} posts per request"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        batch_size = settings.QA_FORM_INGEST_BATCH_SIZE
+        results = []
+        for start in range(0, len(items), batch_size):
+            results.extend(self._ingest_batch(items[start:start + batch_size], start))
+
+        counts = Counter(result['status'] for result in results)
+        failed = counts['error']
+        return Response(
+            {
+                'created': counts['created'],
+                'duplicates': counts['duplicate'],
+                'failed': failed,
+                'results': results
+            },
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
+        )
+
+    def _ingest_batch(self, items, offset):
+        results, valid = [], []
+        for index, item in enumerate(items, start=offset):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+
+        if valid:
+            try:
+                with transaction.atomic():
+                    created = create_posts(self.request.user, [data for _, data in valid])
+            except DatabaseError as exc:
+                results.extend(
+                    {'index': index, 'status': 'error', 'errors': {'non_field_errors': [str(exc)]}}
+                    for index, _ in valid
+                )
+            else:
+                # Duplicates carry the id of the post they were matched to
+                results.extend(
+                    {'index': index, 'status': 'created' if is_new else 'duplicate', 'id': post.id}
+                    for (index, _), (post, is_new) in zip(valid, created)
+                )
+        return sorted(results, key=itemgetter('index'))
+
     @action(detail=True, methods=['POST'])
     @transaction.atomic
     def review(self, request, pk=None):
@@ -55,8 +252,18 @@ class PostViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # The client may send the version it reviewed; otherwise the one
+        # just read is used
+        try:
+            post.version = int(request.data.get('version', post.version))
+        except (TypeError, ValueError):
+            return Response(
+                {"version": ["A valid integer is required."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         # Update post data if provided
-        if request.data:
+        if set(request.data) - {'version'}:
             serializer = self.get_serializer(
                 post,
                 data=request.data,
@@ -65,151 +272,163 @@ class PostViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             serializer.save()
 
-        # Mark as reviewed
-        post.status = 'reviewed'
-        post.reviewed_by = request.user
-        post.reviewed_at = timezone.now()
-        post.save()
+        # Mark as reviewed with a conditional UPDATE: of concurrent reviewers
+        # exactly one matches the unreviewed row, the others get a 409
+        # instead of silently reviewing it again. A post leased to another
+        # reviewer is theirs until the lease expires; reviewing ends the lease.
+        now = timezone.now()
+        reviewed = Post.objects.filter(
+            Q(claimed_by__isnull=True) | Q(claimed_by=request.user) | Q(claim_expires_at__lte=now),
+            pk=post.pk, status='unreviewed', version=post.version
+        ).update(
+            status='reviewed', reviewed_by=request.user, reviewed_at=now,
+            claimed_by=None, claim_expires_at=None,
+            version=F('version') + 1, updated_at=now
+        )
+        if not reviewed:
+            raise VersionConflict(
+                post.pk, 'The post was changed, reviewed or claimed by someone else'
+            )
+        post.status, post.reviewed_by, post.reviewed_at = 'reviewed', request.user, now
+        post.claimed_by, post.claim_expires_at = None, None
+        post.version, post.updated_at = post.version + 1, now
+        self.refresh_nested(post)
 
         return Response(self.get_serializer(post).data)
 
     @action(detail=False, methods=['GET'])
+    @etag_from_posts
     def unreviewed(self, request):
-        queryset = self.get_queryset().filter(status='unreviewed')
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.list_posts(self.get_posts().filter(status='unreviewed'))
 
     @action(detail=False, methods=['GET'])
+    @etag_from_posts
     def reviewed(self, request):
-        queryset = self.get_queryset().filter(status='reviewed')
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.list_posts(self.get_posts().filter(status='reviewed'))
 
     @action(detail=False, methods=['get'])
     def export_csv(self, request):
-        response = HttpResponse(content_type='text/csv')
+        # Stream the file in keyset-paginated batches instead of building it
+        # in memory, so large exports don't hold a worker's RAM hostage.
+        # Exports too big to finish within a request go through /api/exports/
+        response = StreamingHttpResponse(
+            iter_csv(self.get_posts()),
+            content_type='text/csv'
+        )
         response['Content-Disposition'] = 'attachment; filename="qa_data_export.csv"'
+        return response
 
-        writer = csv.writer(response)
-        writer.writerow([
-            'post_id',
-            'source',
-            'caption',
-            'comment',
-            'aspects_and_sentiments',
-            'general_sentiment',
-            'collector',
-            'created_at'
-        ])
-
-        posts = self.get_queryset().prefetch_related(
-            'comments',
-            'comments__aspects'
+    def _export_dataset(self, file_format):
+        extension, content_type = DATASET_FORMATS[file_format]
+        response = StreamingHttpResponse(
+            iter_dataset(self.get_posts(), file_format),
+            content_type=content_type
         )
-
-        for post in posts:
-            for comment in post.comments.all():
-                aspects_data = {
-                    aspect.aspect_name: aspect.sentiment
-                    for aspect in comment.aspects.all()
-                }
-
-                writer.writerow([
-                    post.id,
-                    post.source,
-                    post.caption,
-                    comment.text,
-                    json.dumps(aspects_data),
-                    comment.general_sentiment,
-                    post.user.username,
-                    post.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                ])
-
+        response['Content-Disposition'] = f'attachment; filename="qa_dataset.{extension}"'
         return response
 
     @action(detail=False, methods=['get'])
-    def dashboard_stats(self, request):
-        # Get user's posts
-        user_posts = Post.objects.filter(user=request.user)
-
-        # Get distinct sources for this user
-        user_sources = (
-            Source.objects
-            .filter(post__user=request.user)
-            .distinct()  # This ensures we only count each source once
-        )
+    def export_jsonl(self, request):
+        return self._export_dataset('jsonl')
 
-        # Get top sources with correct counts
-        top_sources = (
-            Source.objects
-            .filter(post__user=request.user)
-            .annotate(count=Count('post'))
-            .order_by('-count')[:5]
-            .values('name', 'count')
-        )
+    @action(detail=False, methods=['get'])
+    def export_parquet(self, request):
+        return self._export_dataset('parquet')
 
-        # Calculate date range
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=6)
-
-        # Get daily post counts
-        daily_counts = (
-            user_posts
-            .filter(created_at__date__gte=start_date)
-            .annotate(date=TruncDate('created_at'))
-            .values('date')
-            .annotate(count=Count('id'))
-            .order_by('date')
-        )
+    @action(detail=False, methods=['get'])
+    def export_arrow(self, request):
+        return self._export_dataset('arrow')
 
-        # Fill in missing dates
-        date_counts = {
-            (start_date + timedelta(days=i)): 0
-            for i in range(7)
-        }
-        for entry in daily_counts:
-            date_counts[entry['date']] = entry['count']
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        # Delta export: everything written or deleted after the ``since``
+        # cursor returned by a previous call, up to ?limit= rows of each kind
+        # per response. While ``more`` is true the cursor points at the next
+        # page of the same window; after the last page it is a timestamp.
+        # Rows carry their updated_at as of the write, but commit later, so
+        # that timestamp trails the clock by QA_FORM_CHANGES_OVERLAP_SECONDS:
+        # the next call reads that window again and late commits are not
+        # skipped. Clients drop the rows they already have by id and
+        # updated_at (or version, for posts)
+        cursor = request.query_params.get('since')
+        since, until, after = None, timezone.now(), None
+        if cursor is not None:
+            try:
+                since = parse_datetime(cursor)
+                if since is None:
+                    since, until, after = decode_changes_cursor(cursor)
+            except ValueError:
+                return Response(
+                    {"detail": "Invalid 'since' cursor"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        try:
+            limit = min(int(request.query_params.get('limit', settings.QA_FORM_CHANGES_PAGE_SIZE)),
+                        settings.QA_FORM_CHANGES_MAX_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({"detail": "Invalid 'limit'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = collect_changes(request.user, since, until, after=after, limit=limit)
+        after = data.pop('after')
+        if data['more']:
+            data['cursor'] = encode_changes_cursor(since, until, after)
+        else:
+            cursor = until - timedelta(seconds=settings.QA_FORM_CHANGES_OVERLAP_SECONDS)
+            if since is not None:
+                cursor = max(cursor, since)
+            data['cursor'] = cursor.isoformat().replace('+00:00', 'Z')
+        return Response(data)
 
-        return Response({
-            'totalPosts': user_posts.count(),
-            'totalComments': Comment.objects.filter(post__user=request.user).count(),
-            'sourcesCount': user_sources.count(),
-            'lastSevenDays': [
-                {
-                    'date': date.strftime('%Y-%m-%d'),
-                    'count': count
-                }
-                for date, count in date_counts.items()
-            ],
-            'topSources': list(top_sources)
-        })
+    @action(detail=False, methods=['get'])
+    @etag_from_posts
+    def dashboard_stats(self, request):
+        # Served from a per-user cache entry that writes invalidate
+        return Response(get_dashboard_stats(request.user))
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadsMixin, NotifyChangesMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        queryset = Comment.objects.filter(post__user=self.request.user)
+        queryset = (
+            Comment.objects
+            .filter(post__user=self.request.user)
+            .prefetch_related('aspects')
+        )
         post_id = self.request.query_params.get('post', None)
         if post_id is not None:
             queryset = queryset.filter(post_id=post_id)
         return queryset
 
+    # Every write bumps the post's version, which is what its ETag and the
+    # analytics rollups read changes from
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+        Post.touch([serializer.instance.post_id])
 
-class AspectViewSet(viewsets.ModelViewSet):
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+        Post.touch([serializer.instance.post_id])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        Tombstone.record('comment', [(instance.pk, self.request.user.id)])
+        instance.delete()
+        Post.touch([instance.post_id])
+
+
+class AspectViewSet(ReplicaReadsMixin, NotifyChangesMixin, viewsets.ModelViewSet):
     queryset = Aspect.objects.all()
     serializer_class = AspectSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         queryset = Aspect.objects.filter(comment__post__user=self.request.user)
@@ -218,15 +437,218 @@ class AspectViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(comment_id=comment_id)
         return queryset
 
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+        Post.touch(Comment.objects.filter(pk=serializer.instance.comment_id).values('post_id'))
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+        Post.touch(Comment.objects.filter(pk=serializer.instance.comment_id).values('post_id'))
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        Tombstone.record('aspect', [(instance.pk, self.request.user.id)])
+        instance.delete()
+        Post.touch(Comment.objects.filter(pk=instance.comment_id).values('post_id'))
+
 
-class SourceViewSet(viewsets.ModelViewSet):
+class SourceViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = Source.objects.all()
     serializer_class = SourceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     @action(detail=False, methods=['get'])
     def search(self, request):
+        # Answered from the in-process source index, not the database
         query = request.query_params.get('q', '').upper()
-        sources = Source.objects.filter(name__startswith=query).order_by('-usage_count')[:5]
-        serializer = self.get_serializer(sources, many=True)
-        return Response(serializer.data)
+        return Response([
+            {'id': source.id, 'name': source.name, 'usage_count': source.usage_count}
+            for source in source_index.search(query, limit=5)
+        ])
+
+
+class ReviewQueueViewSet(ReplicaReadsMixin, viewsets.ViewSet):
+    """
+    Work queue of unreviewed posts. Reviewers claim the next batch, which is
+    leased to them for QA_FORM_QUEUE_LEASE_SECONDS: they can renew or release
+    it, and leases left to expire go back to the queue on the next claim.
+    Claimed posts can be read, edited and reviewed through /api/posts/.
+    """
+    permission_classes = [IsAuthenticated]
+    # Leases change with every claim, so they are read where they were written
+    primary_actions = ('list',)
+
+    def _batch(self, request, post_ids, fields, lease_expires_at=None):
+        posts = select_post_fields(
+            Post.objects.filter(pk__in=post_ids).order_by('created_at', 'id'), fields
+        )
+        return Response({
+            'lease_expires_at': lease_expires_at,
+            'results': PostSerializer(
+                posts, many=True, fields=fields, context={'request': request}
+            ).data,
+        })
+
+    def list(self, request):
+        # The unreviewed posts the user holds a live lease on. Like every
+        # action here, ?fields=summary gives a compact batch; see fieldsets.py
+        fields = parse_post_fields(request.query_params)
+        post_ids = list(
+            Post.objects
+            .filter(held_by(request.user), status='unreviewed')
+            .values_list('id', flat=True)
+        )
+        return self._batch(request, post_ids, fields)
+
+    @action(detail=False, methods=['POST'])
+    def claim(self, request):
+        # e.g. {"count": 20}; reviewers may add {"collector": "<username>"}
+        fields = parse_post_fields(request.query_params)
+        params = QueueClaimSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        post_ids, lease_expires_at = claim_posts(
+            request.user,
+            params.validated_data['count'],
+            collector=params.validated_data.get('collector'),
+        )
+        return self._batch(request, post_ids, fields, lease_expires_at)
+
+    @action(detail=False, methods=['POST'])
+    def renew(self, request):
+        params = QueueLeaseSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        post_ids, lease_expires_at = renew_claims(request.user, params.validated_data.get('ids'))
+        return Response({'lease_expires_at': lease_expires_at, 'ids': post_ids})
+
+    @action(detail=False, methods=['POST'])
+    def release(self, request):
+        params = QueueLeaseSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        released = release_claims(request.user, params.validated_data.get('ids'))
+        return Response({'released': released})
+
+
+class ExportJobViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Background exports of the user's posts. POST {"format": "csv"} submits
+    one (csv, jsonl, parquet or arrow) and returns the job: 201 when it was
+    queued, 200 when an identical job is reused. Poll the job until its
+    status is succeeded, then GET its download_url. Files expire after
+    QA_FORM_EXPORT_JOB_TTL. Jobs are run by the ``run_export_jobs`` command.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = submit_export(request.user, serializer.validated_data['format'])
+        return Response(
+            self.get_serializer(job).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'succeeded':
+            return Response(
+                {"detail": f"The export is {job.status}, not ready for download"},
+                status=status.HTTP_409_CONFLICT
+            )
+        if job.expires_at <= timezone.now():
+            return Response({"detail": "The export has expired"}, status=status.HTTP_410_GONE)
+        file_name, content_type = JOB_FORMATS[job.format]
+        return FileResponse(
+            job.file.open('rb'), as_attachment=True, filename=file_name, content_type=content_type
+        )
+
+
+class SearchViewSet(ReplicaReadsMixin, viewsets.ViewSet):
+    """Ranked full-text search over the user's posts, comments and aspects."""
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        if connection.vendor != 'postgresql':
+            return Response(
+                {"detail": "Full-text search needs PostgreSQL"},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        params = SearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = {
+            key: params.validated_data[key]
+            for key in ('source', 'status', 'sentiment', 'aspect_name')
+            if key in params.validated_data
+        }
+        results = search(
+            request.user,
+            params.validated_data['q'],
+            target=params.validated_data['target'],
+            filters=filters,
+            limit=params.validated_data['limit'],
+        )
+        return Response({'results': results})
+
+
+class AnalyticsViewSet(ReplicaReadsMixin, viewsets.ViewSet):
+    """
+    Grouped counts read from the rollup tables kept by ``refresh_rollups``.
+    Collectors see their own data; staff see everyone's and may group or
+    filter by collector.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _rollup(self, request, model, dimensions, lookups):
+        if not request.user.is_staff:
+            dimensions = {name: value for name, value in dimensions.items() if name != 'collector'}
+        params = AnalyticsParamsSerializer(
+            data=request.query_params, context={'dimensions': dimensions}
+        )
+        params.is_valid(raise_exception=True)
+        filters = {
+            name: value for name, value in params.validated_data.items()
+            if name in lookups and (name != 'collector' or request.user.is_staff)
+        }
+        results = query_rollup(
+            model, dimensions, lookups, params.validated_data['group_by'], filters,
+            user=None if request.user.is_staff else request.user
+        )
+        last = RollupRefresh.objects.order_by('-started_at').first()
+        return Response({
+            # Writes made after this moment may not be counted yet
+            'as_of': last and last.started_at,
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def aspects(self, request):
+        # Aspect counts, e.g. ?group_by=aspect_name,sentiment&source=INSTAGRAM
+        return self._rollup(request, AspectSentimentRollup, ASPECT_DIMENSIONS, ASPECT_FILTERS)
+
+    @action(detail=False, methods=['get'])
+    def sentiments(self, request):
+        # General sentiment distribution, e.g. ?group_by=source,general_sentiment
+        return self._rollup(request, CommentSentimentRollup, SENTIMENT_DIMENSIONS, SENTIMENT_FILTERS)
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """
+    Request metrics of every worker, per endpoint: response counts and
+    histograms of latency, database queries and time, serializer time and
+    response size, plus the latest slow query samples. JSON by default,
+    Prometheus text with ?format=prometheus. Staff only.
+    """
+    permission_classes = [IsAdminUser]
+    renderer_classes = [ORJSONRenderer, PrometheusRenderer]
+
+    def list(self, request):
+        return Response(collect())
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class QAFormConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qa_form'
-    verbose_name = 'Social Media QA Form'
\ No newline at end of file
+    verbose_name = 'Social Media QA Form'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
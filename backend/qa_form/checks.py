@@ -0,0 +1,30 @@
+# backend/qa_form/checks.py
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Metrics and the replica pins only work across workers with a shared cache."""
+    features = []
+    if settings.QA_FORM_METRICS_ENABLED:
+        features.append('metrics (QA_FORM_METRICS_ENABLED)')
+    if settings.QA_FORM_REPLICA_DATABASES:
+        features.append('replica reads (QA_FORM_REPLICA_DATABASES)')
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if not features or backend not in PER_PROCESS_CACHES:
+        return []
+    return [Warning(
+        f'The default cache ({backend}) is per-process, so {" and ".join(features)} '
+        f'only see the worker process serving the request',
+        hint=(
+            'With several worker processes, point CACHES at a shared backend '
+            '(Redis or memcached, see DJANGO_CACHE_BACKEND), as settings_prod does.'
+        ),
+        id='qa_form.W001',
+    )]
@@ -0,0 +1,70 @@
+# backend/qa_form/db_router.py
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Database alias the current request reads from; None means "no opinion",
+# which sends reads to the primary like Django does without a router
+_read_database = ContextVar('qa_form_read_database', default=None)
+
+
+def pin_key(user_id):
+    return f'qa_form:pin-primary:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Serve the user's reads from the primary until replicas caught up."""
+    if settings.QA_FORM_REPLICA_DATABASES:
+        cache.set(pin_key(user_id), True, settings.QA_FORM_PRIMARY_PIN_SECONDS)
+
+
+def route_reads(user_id):
+    """
+    Send the current request's reads to a random replica, unless there is
+    none or the user wrote recently (their own changes may not have been
+    replicated yet).
+    """
+    replicas = settings.QA_FORM_REPLICA_DATABASES
+    if replicas and not cache.get(pin_key(user_id)):
+        _read_database.set(random.choice(replicas))
+    else:
+        _read_database.set(None)
+
+
+def reset_reads(**kwargs):
+    _read_database.set(None)
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica chosen by ``route_reads`` for the current
+    request, and everything else to ``default``.
+
+    Replicas are expected to be copies of the primary kept in sync by the
+    database (streaming replication), so migrations only run on
+    ``default``. Locally, a replica alias pointing at the same database
+    (or SQLite file) as ``default`` exercises the routing without a second
+    server.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'django_cache':
+            # A DatabaseCache holds the primary pins, which must not lag
+            return 'default'
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *settings.QA_FORM_REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.QA_FORM_REPLICA_DATABASES:
+            return False
+        return None
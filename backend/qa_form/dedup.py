@@ -0,0 +1,74 @@
+# backend/qa_form/dedup.py
+import random
+import struct
+import unicodedata
+from hashlib import blake2b
+
+# MinHash signatures of word 3-grams, split into LSH bands of 4 values:
+# two texts share at least one band with probability 1 - (1 - s**4)**16 for
+# a similarity s, i.e. almost surely above 0.7 and rarely below 0.3
+SHINGLE_WORDS = 3
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures have to stay comparable across processes and releases
+_rng = random.Random(20241101)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def normalize(text):
+    """
+    The text as compared for duplicates: Unicode NFKC, case-folded, without
+    invisible formatting characters and with whitespace collapsed.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return ' '.join(''.join(char for char in text if unicodedata.category(char) != 'Cf').split())
+
+
+def content_hash(text):
+    """Hex digest of the normalized text; equal for exact duplicates."""
+    return blake2b(normalize(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def shingles(text):
+    words = normalize(text).split()
+    if len(words) <= SHINGLE_WORDS:
+        return {' '.join(words)}
+    return {
+        ' '.join(words[start:start + SHINGLE_WORDS])
+        for start in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text):
+    """MinHash signature of the text's word 3-grams."""
+    hashes = [
+        int.from_bytes(blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for shingle in shingles(text)
+    ]
+    return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the texts two signatures were made from."""
+    return sum(1 for a, b in zip(signature, other) if a == b) / len(signature)
+
+
+def band_buckets(signature):
+    """One signed 64-bit bucket per LSH band; similar texts share some."""
+    rows = len(signature) // MINHASH_BANDS
+    return [
+        int.from_bytes(
+            blake2b(
+                struct.pack(f'>H{rows}Q', band, *signature[band * rows:(band + 1) * rows]),
+                digest_size=8
+            ).digest(),
+            'big',
+            signed=True
+        )
+        for band in range(MINHASH_BANDS)
+    ]
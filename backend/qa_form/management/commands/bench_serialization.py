@@ -0,0 +1,84 @@
+# backend/qa_form/management/commands/bench_serialization.py
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from ...api.fastpath import post_values, serialize_post_rows
+from ...api.fieldsets import select_post_fields
+from ...api.ingest import create_posts
+from ...api.renderers import ORJSONRenderer
+from ...api.serializers import PostSerializer
+from ...models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the DRF serializer path with the .values() fast path on one '
+        'page of posts with many comments and aspects, and check that both '
+        'render the same JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100, help='Posts in the page (default: 100)')
+        parser.add_argument('--comments', type=int, default=20, help='Comments per post (default: 20)')
+        parser.add_argument('--aspects', type=int, default=3, help='Aspects per comment (default: 3)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs of each path; the best is kept (default: 5)')
+
+    def handle(self, *args, **options):
+        # The data lives in a transaction that is rolled back afterwards
+        with transaction.atomic():
+            user = self.create_dataset(options['posts'], options['comments'], options['aspects'])
+            posts = Post.objects.filter(user=user).order_by('created_at', 'id')
+
+            paths = {
+                'DRF serializer + JSONRenderer': lambda: JSONRenderer().render(
+                    PostSerializer(select_post_fields(posts), many=True).data
+                ),
+                'values() fast path + ORJSONRenderer': lambda: ORJSONRenderer().render(
+                    serialize_post_rows(list(post_values(posts)))
+                ),
+            }
+            timings, outputs = {}, {}
+            for name, render in paths.items():
+                timings[name] = min(self.time(render) for _ in range(options['repeat']))
+                outputs[name] = render()
+            transaction.set_rollback(True)
+
+        baseline, fast = outputs.values()
+        if baseline != fast:
+            raise CommandError('The fast path renders different JSON than the serializer')
+
+        slowest = max(timings.values())
+        for name, seconds in timings.items():
+            self.stdout.write(
+                f"{name:40} {seconds * 1000:9.1f} ms  {slowest / seconds:5.1f}x  "
+                f"{len(outputs[name]) / 1024:8.0f} KiB"
+            )
+        self.stdout.write(self.style.SUCCESS('Both paths render identical JSON'))
+
+    def time(self, render):
+        started = time.perf_counter()
+        render()
+        return time.perf_counter() - started
+
+    def create_dataset(self, posts, comments, aspects):
+        user = User.objects.create_user('bench-serialization')
+        post_data = {
+            'caption': 'Caption with some text',
+            'source': 'Source',
+            'comments': [
+                {
+                    'text': 'A comment of average length, with a few words in it',
+                    'general_sentiment': 'neutral',
+                    'aspects': [
+                        {'aspect_name': 'Aspect', 'aspect_text': 'aspect text', 'sentiment': 'positive'}
+                    ] * aspects,
+                }
+            ] * comments,
+        }
+        # Identical posts on purpose, so keep the duplicates
+        create_posts(user, [post_data] * posts, dedup='off')
+        return user
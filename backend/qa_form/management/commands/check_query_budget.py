@@ -0,0 +1,141 @@
+# backend/qa_form/management/commands/check_query_budget.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from ...api.ingest import create_posts
+from ...api.jobs import submit_export
+from ...api.queue import claim_posts
+from ...api.typeahead import source_index
+
+# (method, url, max queries). {post}, {comment} and {aspect} are filled in
+# with rows owned by the benchmark user. The same number of queries must be
+# run whatever the size of the dataset. Conditional post endpoints include
+# the ETag query; a 304 costs only that one.
+ENDPOINTS = [
+    ('get', '/api/posts/', 4),
+    ('get', '/api/posts/{post}/', 4),
+    ('get', '/api/posts/unreviewed/', 4),
+    ('get', '/api/posts/unreviewed/?fields=summary', 2),
+    ('get', '/api/posts/reviewed/', 4),
+    ('put', '/api/posts/{post}/', 14),
+    ('get', '/api/posts/export_csv/', 3),
+    ('get', '/api/posts/dashboard_stats/', 6),
+    ('get', '/api/comments/', 2),
+    ('get', '/api/comments/{comment}/', 2),
+    ('get', '/api/aspects/', 1),
+    ('get', '/api/aspects/{aspect}/', 1),
+    ('get', '/api/sources/', 1),
+    ('get', '/api/sources/search/?q=S', 0),
+    ('get', '/api/queue/', 4),
+    ('get', '/api/queue/?fields=summary', 2),
+    ('get', '/api/exports/', 1),
+]
+
+
+def build_dataset(posts, comments, aspects):
+    """
+    Create a user owning ``posts`` posts of ``comments`` comments of
+    ``aspects`` aspects each, with leases and export jobs, and return an
+    API client logged in as them, the ids to fill ENDPOINTS with and the
+    payload of the PUT.
+    """
+    user = User.objects.create_user(f'query-budget-{posts}')
+    post_data = {
+        'caption': 'Caption',
+        'source': 'Source',
+        'comments': [
+            {
+                'text': 'Comment',
+                'general_sentiment': 'neutral',
+                'aspects': [
+                    {'aspect_name': 'Aspect', 'aspect_text': '', 'sentiment': 'positive'}
+                ] * aspects,
+            }
+        ] * comments,
+    }
+    # One extra post so the reviewed queue is never empty. The posts are
+    # identical on purpose, so duplicates are kept
+    created = [post for post, _ in create_posts(user, [post_data] * (posts + 1), dedup='off')]
+    created[-1].status = 'reviewed'
+    created[-1].save()
+    # Lease the rest so the review queue lists them
+    claim_posts(user, posts)
+    # Queue a few exports so the job list is not empty
+    for file_format in ('csv', 'jsonl', 'parquet'):
+        submit_export(user, file_format)
+
+    post = created[0]
+    comment = post.comments.first()
+    ids = {'post': post.id, 'comment': comment.id, 'aspect': comment.aspects.first().id}
+
+    client = APIClient()
+    client.force_authenticate(user)
+    payload = client.get(f'/api/posts/{post.id}/').json()
+    return client, ids, payload
+
+
+def call(client, method, url, payload):
+    """Request ``url`` like ENDPOINTS says, reading a streamed response to the end."""
+    if method == 'put':
+        response = client.put(url, payload, format='json')
+    else:
+        response = client.get(url)
+    # Drain streaming responses so their queries are counted
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+class Command(BaseCommand):
+    help = 'Check that every qa_form endpoint stays within its query budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=20,
+            help='Posts in the larger of the two datasets compared (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back, so no
+        # benchmark data is left behind. Replicas would not see that data, so
+        # every query goes to the primary.
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*'], QA_FORM_REPLICA_DATABASES=[]):
+            # The typeahead index is loaded once per process; load it up
+            # front so both runs measure it warm
+            source_index.refresh()
+            small = self.measure(posts=1, comments=1, aspects=1)
+            large = self.measure(posts=options['posts'], comments=5, aspects=3)
+            transaction.set_rollback(True)
+
+        failures = []
+        for (method, url, budget), few, many in zip(ENDPOINTS, small, large):
+            ok = few == many and many <= budget
+            self.stdout.write(
+                f"{'ok  ' if ok else 'FAIL'} {method.upper():4} {url:40} "
+                f"{few:3} / {many:3} queries (budget {budget})"
+            )
+            if not ok:
+                failures.append(url)
+
+        if failures:
+            raise CommandError(f"{len(failures)} endpoint(s) over their query budget")
+        self.stdout.write(self.style.SUCCESS('All endpoints within their query budget'))
+
+    def measure(self, posts, comments, aspects):
+        client, ids, payload = build_dataset(posts, comments, aspects)
+        counts = []
+        for method, url, budget in ENDPOINTS:
+            url = url.format(**ids)
+            with CaptureQueriesContext(connection) as queries:
+                response = call(client, method, url, payload)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{method.upper()} {url} returned {response.status_code}: {response.content[:200]}'
+                )
+            counts.append(len(queries))
+        return counts
@@ -0,0 +1,156 @@
+# backend/qa_form/management/commands/explain_hot_queries.py
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ...api.ingest import create_posts
+from ...models import Post, Comment, Aspect, Source
+
+# Indexes added for the hot queries (migration 0004). They are dropped inside
+# the benchmark transaction to measure the "before" plans.
+HOT_QUERY_INDEXES = [
+    (Post, 'post_user_created_idx'),
+    (Post, 'post_user_status_idx'),
+    (Post, 'post_unreviewed_queue_idx'),
+    (Post, 'post_user_updated_idx'),
+    (Comment, 'comment_post_id_idx'),
+    (Aspect, 'aspect_comment_id_idx'),
+    (Source, 'source_usage_count_idx'),
+]
+
+
+def hot_queries(user):
+    """The queries behind the busiest endpoints, as (label, queryset) pairs."""
+    week_ago = timezone.now().date() - timedelta(days=6)
+    posts = Post.objects.filter(user=user)
+    return [
+        ('post list', posts.order_by('created_at', 'id')[:51]),
+        ('unreviewed queue', posts.filter(status='unreviewed').order_by('created_at', 'id')[:51]),
+        ('reviewed queue', posts.filter(status='reviewed').order_by('created_at', 'id')[:51]),
+        ('dashboard daily counts', (
+            posts
+            .filter(created_at__date__gte=week_ago)
+            .annotate(date=TruncDate('created_at'))
+            .values('date')
+            .annotate(count=Count('id'))
+            .order_by('date')
+        )),
+        ('comment list', Comment.objects.filter(post__user=user).order_by('created_at', 'id')[:51]),
+        ('aspect list', Aspect.objects.filter(comment__post__user=user).order_by('id')[:51]),
+        ('export page', (
+            Comment.objects
+            .filter(post__in=posts.values('pk'))
+            .order_by('post_id', 'id')[:2000]
+        )),
+        ('changes since', posts.filter(updated_at__gt=timezone.now() - timedelta(hours=1))),
+        ('source search', Source.objects.filter(name__startswith='S').order_by('-usage_count')[:5]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Print EXPLAIN ANALYZE plans and latencies of the hot qa_form queries '
+        'with and without the hot query indexes. Indexes are dropped inside a '
+        'transaction that is rolled back, but they are locked meanwhile, so '
+        'run this against a benchmark database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Posts to generate (inside the rolled-back transaction) before measuring'
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Executions per query for the latency figures (default: 20)'
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Print the full EXPLAIN ANALYZE output of every query'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_hot_queries needs PostgreSQL')
+
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            user = User.objects.annotate(post_count=Count('posts')).order_by('-post_count').first()
+            if user is None:
+                raise CommandError('No data to query; load a corpus or pass --seed')
+
+            after = self.measure(user, options)
+            with connection.schema_editor() as editor:
+                for model, name in HOT_QUERY_INDEXES:
+                    index = next(index for index in model._meta.indexes if index.name == name)
+                    editor.remove_index(model, index)
+            before = self.measure(user, options)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"\n{'query':24} {'before ms':>10} {'after ms':>10}  plan (after)")
+        for label in after:
+            self.stdout.write(
+                f"{label:24} {before[label]['latency']:10.2f} {after[label]['latency']:10.2f}"
+                f"  {after[label]['plan'].splitlines()[0]}"
+            )
+
+    def measure(self, user, options):
+        results = {}
+        for label, queryset in hot_queries(user):
+            plan = queryset.explain(analyze=True)
+            timings = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = {'plan': plan, 'latency': statistics.median(timings)}
+            if options['plans']:
+                self.stdout.write(f'-- {label}\n{plan}\n')
+        return results
+
+    def seed(self, count):
+        # A handful of collectors owning most of the posts, each post with a
+        # few comments and aspects; enough to make the planner pick indexes
+        users = [User.objects.create_user(f'explain-{i}') for i in range(10)]
+        sources = [f'SOURCE {i}' for i in range(200)]
+        for start in range(0, count, 1000):
+            posts_data = [
+                {
+                    'caption': f'Caption {start + i}',
+                    'source': random.choice(sources),
+                    'comments': [
+                        {
+                            'text': 'Comment',
+                            'general_sentiment': random.choice(['positive', 'neutral', 'negative']),
+                            'aspects': [
+                                {'aspect_name': 'price', 'aspect_text': '', 'sentiment': 'neutral'}
+                            ] * random.randint(0, 3),
+                        }
+                    ] * random.randint(1, 8),
+                }
+                for i in range(min(1000, count - start))
+            ]
+            # The synthetic comments repeat each other, so keep them all
+            created = create_posts(
+                random.choice(users[:3] if random.random() < 0.8 else users), posts_data, dedup='off'
+            )
+            Post.objects.filter(
+                id__in=[post.id for post, _ in created if random.random() < 0.5]
+            ).update(status='reviewed')
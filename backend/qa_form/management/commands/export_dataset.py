@@ -0,0 +1,43 @@
+# backend/qa_form/management/commands/export_dataset.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...api.exports import DATASET_FORMATS, iter_dataset
+from ...models import Post
+
+
+class Command(BaseCommand):
+    help = 'Export posts, comments and aspects as a normalized dataset (one row per aspect)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the file to write')
+        parser.add_argument(
+            '--format',
+            choices=sorted(DATASET_FORMATS),
+            default='parquet',
+            help='Output format (default: parquet)'
+        )
+        parser.add_argument('--user', help='Only export posts collected by this username')
+        parser.add_argument('--batch-size', type=int, help='Comments fetched per query')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options['user']:
+            posts = posts.filter(user__username=options['user'])
+
+        try:
+            chunks = iter_dataset(posts, options['format'], options['batch_size'])
+        except ImportError:
+            raise CommandError(f"The {options['format']} format requires pyarrow to be installed")
+
+        started = time.monotonic()
+        written = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} bytes to {options['output']} in {time.monotonic() - started:.1f}s"
+        ))
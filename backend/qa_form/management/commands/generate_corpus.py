@@ -0,0 +1,147 @@
+# backend/qa_form/management/commands/generate_corpus.py
+import json
+import math
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+WORDS = (
+    'bei huduma bidhaa nzuri mbaya sana haraka polepole simu mtandao data '
+    'kifurushi ofa bando malipo wateja muda ubora usafirishaji duka app '
+    'price quality delivery service network battery screen camera support '
+    'refund order late fast cheap expensive good bad great poor love hate'
+).split()
+
+ASPECT_NAMES = (
+    'bei', 'huduma', 'ubora', 'mtandao', 'usafirishaji', 'malipo', 'price',
+    'quality', 'delivery', 'customer service', 'network', 'battery',
+    'screen', 'camera', 'app', 'packaging', 'refund', 'availability',
+)
+
+SOURCE_NAMES = (
+    'INSTAGRAM', 'TWITTER', 'FACEBOOK', 'TIKTOK', 'YOUTUBE', 'JAMIIFORUMS',
+    'WHATSAPP', 'GOOGLE REVIEWS', 'PLAY STORE', 'APP STORE', 'LINKEDIN', 'REDDIT',
+)
+
+SENTIMENTS = ('positive', 'neutral', 'negative')
+SENTIMENT_WEIGHTS = (45, 30, 25)
+
+# Aspects per comment: 0 to 4, most comments have one or two
+ASPECT_COUNT_WEIGHTS = (25, 35, 25, 10, 5)
+
+
+def zipf_weights(count, exponent=1.1):
+    """Cumulative weights where rank ``r`` is 1/r**exponent as likely as the first."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Write a synthetic JSONL corpus for load_corpus, with realistic skew: '
+        'a few collectors and sources own most posts, comments per post are '
+        'long-tailed, and sentiments and aspect names are unevenly spread. '
+        'The same seed always writes the same corpus.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Corpus file to write (.jsonl)')
+        parser.add_argument('--comments', type=int, default=10000, help='Comments to generate (default: 10000)')
+        parser.add_argument(
+            '--comments-per-post',
+            type=float,
+            default=8,
+            help='Median comments per post; the distribution is log-normal (default: 8)'
+        )
+        parser.add_argument('--users', type=int, default=20, help='Collectors (default: 20)')
+        parser.add_argument(
+            '--sources',
+            type=int,
+            default=200,
+            help='Sources; the first are well-known names, the rest numbered (default: 200)'
+        )
+        parser.add_argument('--days', type=int, default=365, help='Days the posts are spread over (default: 365)')
+        parser.add_argument(
+            '--reviewed',
+            type=float,
+            default=0.6,
+            help='Share of reviewed posts, which are the older ones (default: 0.6)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument(
+            '--user-prefix',
+            default='collector',
+            help='Collectors are named <prefix>-1, <prefix>-2, ... (default: collector)'
+        )
+        parser.add_argument(
+            '--create-users',
+            action='store_true',
+            help='Create the collector accounts that do not exist yet, so load_corpus can load the file'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        usernames = [f"{options['user_prefix']}-{number}" for number in range(1, options['users'] + 1)]
+        sources = list(SOURCE_NAMES[:options['sources']]) + [
+            f'SOURCE {number}' for number in range(len(SOURCE_NAMES) + 1, options['sources'] + 1)
+        ]
+        user_weights = zipf_weights(len(usernames))
+        source_weights = zipf_weights(len(sources))
+        aspect_weights = zipf_weights(len(ASPECT_NAMES), exponent=0.8)
+
+        if options['create_users']:
+            existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+            User.objects.bulk_create([
+                User(username=username, password='!') for username in usernames if username not in existing
+            ])
+
+        def text(median_words):
+            length = max(1, round(rng.lognormvariate(math.log(median_words), 0.6)))
+            return ' '.join(rng.choices(WORDS, k=length))
+
+        now = timezone.now()
+        comments_left = options['comments']
+        posts = comments = aspects = 0
+        with open(options['path'], 'w', encoding='utf-8') as corpus:
+            while comments_left > 0:
+                count = min(
+                    comments_left,
+                    max(1, round(rng.lognormvariate(math.log(options['comments_per_post']), 1))),
+                )
+                age = rng.random()
+                post_comments = []
+                for _ in range(count):
+                    post_aspects = [
+                        {
+                            'aspect_name': rng.choices(ASPECT_NAMES, cum_weights=aspect_weights)[0],
+                            'aspect_text': text(3),
+                            'sentiment': rng.choices(SENTIMENTS, SENTIMENT_WEIGHTS)[0],
+                        }
+                        for _ in range(rng.choices(range(len(ASPECT_COUNT_WEIGHTS)), ASPECT_COUNT_WEIGHTS)[0])
+                    ]
+                    post_comments.append({
+                        'text': text(15),
+                        'general_sentiment': rng.choices(SENTIMENTS, SENTIMENT_WEIGHTS)[0],
+                        'aspects': post_aspects,
+                    })
+                    aspects += len(post_aspects)
+
+                corpus.write(json.dumps({
+                    'caption': text(25),
+                    'source': rng.choices(sources, cum_weights=source_weights)[0],
+                    'collector': rng.choices(usernames, cum_weights=user_weights)[0],
+                    # Older posts are the reviewed ones
+                    'status': 'reviewed' if age > 1 - options['reviewed'] else 'unreviewed',
+                    'created_at': (now - timedelta(days=options['days'] * age)).isoformat(),
+                    'comments': post_comments,
+                }) + '\n')
+                posts += 1
+                comments += count
+                comments_left -= count
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {posts} posts, {comments} comments and {aspects} aspects to {options['path']}"
+        ))
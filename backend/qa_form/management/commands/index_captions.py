@@ -0,0 +1,51 @@
+# backend/qa_form/management/commands/index_captions.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from ...api.ingest import index_captions
+from ...models import CaptionBand, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Store the MinHash LSH buckets of the captions of posts that have none '
+        'yet, so near-duplicate detection (QA_FORM_DEDUP_NEAR) also matches '
+        'posts ingested before it was turned on'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Posts per transaction (default: 2000)')
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop every bucket first, e.g. after captions were edited in bulk'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            CaptionBand.objects.all().delete()
+
+        started = time.monotonic()
+        pending = (
+            Post.objects
+            .filter(~Exists(CaptionBand.objects.filter(post=OuterRef('pk'))))
+            .order_by('id')
+            .only('id', 'source_id', 'caption')
+        )
+        indexed, last_id = 0, 0
+        while True:
+            batch = list(pending.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                index_captions(batch)
+            indexed += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'{indexed} captions indexed')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} captions in {time.monotonic() - started:.1f}s'
+        ))
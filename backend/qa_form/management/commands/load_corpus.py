@@ -0,0 +1,324 @@
+# backend/qa_form/management/commands/load_corpus.py
+import csv
+import io
+import json
+import os
+import time
+from datetime import timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ...api.ingest import create_posts, deduplicate, index_captions, notify_merged, resolve_sources
+from ...api.typeahead import usage_buffer
+from ...dedup import content_hash
+from ...models import Post, Comment, Aspect
+from ...signals import posts_changed
+
+SENTIMENTS = {choice for choice, _ in Comment.SENTIMENT_CHOICES}
+STATUSES = {choice for choice, _ in Post.STATUS_CHOICES}
+
+
+def read_jsonl(path):
+    """Yield one post per line, in the same shape as the bulk ingest API."""
+    with open(path, encoding='utf-8') as corpus:
+        for number, line in enumerate(corpus, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f'{path}:{number}: {exc}')
+
+
+def read_csv(path):
+    """
+    Yield one post per group of consecutive rows sharing a ``post_id``.
+
+    Accepts both the ``export_csv`` layout (one row per comment, aspects as
+    a JSON object in ``aspects_and_sentiments``) and the ``export_dataset``
+    layout (one row per aspect, grouped into comments by ``comment_id``).
+    """
+    with open(path, newline='', encoding='utf-8') as corpus:
+        reader = csv.DictReader(corpus)
+        dataset_layout = 'comment_id' in (reader.fieldnames or [])
+
+        post, post_key, comment_key = None, None, None
+        for row in reader:
+            if row['post_id'] != post_key:
+                if post is not None:
+                    yield post
+                post_key, comment_key = row['post_id'], None
+                post = {
+                    'caption': row['caption'],
+                    'source': row['source'],
+                    'collector': row.get('collector'),
+                    'status': row.get('status'),
+                    'created_at': row.get('post_created_at') or row.get('created_at'),
+                    'comments': [],
+                }
+
+            if not dataset_layout:
+                post['comments'].append({
+                    'text': row['comment'],
+                    'general_sentiment': row['general_sentiment'],
+                    'aspects': [
+                        {'aspect_name': name, 'aspect_text': '', 'sentiment': sentiment}
+                        for name, sentiment in json.loads(row['aspects_and_sentiments'] or '{}').items()
+                    ],
+                })
+                continue
+
+            if row['comment_id'] != comment_key:
+                comment_key = row['comment_id']
+                post['comments'].append({
+                    'text': row['comment_text'],
+                    'general_sentiment': row['general_sentiment'],
+                    'aspects': [],
+                })
+            if row.get('aspect_name'):
+                post['comments'][-1]['aspects'].append({
+                    'aspect_name': row['aspect_name'],
+                    'aspect_text': row.get('aspect_text') or '',
+                    'sentiment': row['sentiment'],
+                })
+
+        if post is not None:
+            yield post
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load a CSV or JSONL corpus of posts, comments and aspects'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Corpus file (.csv or .jsonl)')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Corpus format (default: guessed from the file extension)'
+        )
+        parser.add_argument(
+            '--user',
+            help='Username owning posts that have no collector of their own'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Posts loaded per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file (default: <path>.checkpoint)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip the posts recorded in the checkpoint file'
+        )
+        parser.add_argument(
+            '--dedup',
+            choices=['merge', 'skip', 'off'],
+            help='What to do with duplicate posts and comments (default: QA_FORM_DEDUP_MODE)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        self.default_user = options['user']
+        self.user_ids = {}
+        self.dedup = options['dedup'] or settings.QA_FORM_DEDUP_MODE
+        self.duplicates = 0
+
+        progress = {'posts': 0, 'comments': 0, 'aspects': 0}
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                progress = json.load(checkpoint)
+            self.stdout.write(f"Resuming after {progress['posts']} posts")
+
+        reader = read_csv if file_format == 'csv' else read_jsonl
+        records = islice(reader(path), progress['posts'], None)
+        use_copy = connection.vendor == 'postgresql'
+
+        started = time.monotonic()
+        loaded_rows = 0
+        while True:
+            batch = list(islice(records, options['batch_size']))
+            if not batch:
+                break
+
+            with transaction.atomic():
+                counts = self.load_batch(batch, use_copy)
+            for user_id in self.user_ids.values():
+                posts_changed.send(sender=self.__class__, user_id=user_id)
+
+            for key, count in counts.items():
+                progress[key] += count
+            with open(checkpoint_path, 'w') as checkpoint:
+                json.dump(progress, checkpoint)
+
+            loaded_rows += sum(counts.values())
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{progress['posts']} posts, {progress['comments']} comments, "
+                f"{progress['aspects']} aspects loaded "
+                f"({loaded_rows / elapsed:,.0f} rows/s)"
+            )
+
+        # Write the buffered source usage counts before exiting
+        usage_buffer.flush()
+        summary = f"Loaded {loaded_rows} rows in {time.monotonic() - started:.1f}s"
+        if self.duplicates:
+            summary += f"; {self.duplicates} duplicate posts {'merged' if self.dedup == 'merge' else 'skipped'}"
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def get_user_id(self, username):
+        username = username or self.default_user
+        if not username:
+            raise CommandError('Post has no collector; pass --user to set a default owner')
+        if username not in self.user_ids:
+            try:
+                self.user_ids[username] = User.objects.get(username=username).id
+            except User.DoesNotExist:
+                raise CommandError(f'Unknown user "{username}"')
+        return self.user_ids[username]
+
+    def clean_post(self, post, now):
+        for comment in post.get('comments', []):
+            if comment.get('general_sentiment') not in SENTIMENTS:
+                raise CommandError(f"Invalid general_sentiment in post {post.get('caption')!r}")
+            for aspect in comment.get('aspects', []):
+                if aspect.get('sentiment') not in SENTIMENTS:
+                    raise CommandError(f"Invalid aspect sentiment in post {post.get('caption')!r}")
+
+        created_at = parse_datetime(post.get('created_at') or '') or now
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at, dt_timezone.utc)
+        return {
+            **post,
+            'user_id': self.get_user_id(post.get('collector') or post.get('user')),
+            'status': post.get('status') if post.get('status') in STATUSES else 'unreviewed',
+            'created_at': created_at,
+            'comments': post.get('comments', []),
+        }
+
+    def load_batch(self, batch, use_copy):
+        now = timezone.now()
+        posts = [self.clean_post(post, now) for post in batch]
+
+        if not use_copy:
+            # Other databases fall back to the ORM bulk path, which sets the
+            # status and creation time of the new posts afterwards. Its counts
+            # are of the rows read, duplicates included
+            for user_id in {post['user_id'] for post in posts}:
+                user_posts = [post for post in posts if post['user_id'] == user_id]
+                created = create_posts(User(id=user_id), user_posts, dedup=self.dedup)
+                new = []
+                for (instance, is_new), post in zip(created, user_posts):
+                    if is_new:
+                        instance.status, instance.created_at = post['status'], post['created_at']
+                        new.append(instance)
+                Post.objects.bulk_update(new, ['status', 'created_at'], batch_size=1000)
+                self.duplicates += len(created) - len(new)
+            return {
+                'posts': len(posts),
+                'comments': sum(len(post['comments']) for post in posts),
+                'aspects': sum(len(comment.get('aspects', []))
+                               for post in posts for comment in post['comments']),
+            }
+
+        sources = resolve_sources(post['source'] for post in posts)
+        # Duplicates of the collector's stored posts (or of earlier ones in
+        # the batch) are merged or skipped like on the API; see
+        # api.ingest.deduplicate
+        targets, comments_data = deduplicate(
+            [post['user_id'] for post in posts], posts, sources, self.dedup
+        )
+        new = [index for index, target in enumerate(targets) if target == index]
+        reserved = dict(zip(new, self.reserve_ids(Post, len(new))))
+        post_ids = [reserved[target] if isinstance(target, int) else target.pk for target in targets]
+        counts = {
+            'posts': len(posts),
+            'comments': sum(len(comments) for comments in comments_data),
+            'aspects': sum(len(comment.get('aspects', []))
+                           for comments in comments_data for comment in comments),
+        }
+        comment_ids = iter(self.reserve_ids(Comment, counts['comments']))
+
+        post_rows, comment_rows, aspect_rows = [], [], []
+        for index, post in enumerate(posts):
+            if index in reserved:
+                post_rows.append([
+                    post_ids[index], post['caption'], content_hash(post['caption']),
+                    sources[post['source'].upper()].id, post['user_id'], post['status'],
+                    post['created_at'], now, 1,
+                ])
+            for comment in comments_data[index]:
+                comment_id = next(comment_ids)
+                comment_rows.append([
+                    comment_id, post_ids[index], comment['text'], content_hash(comment['text']),
+                    comment['general_sentiment'], now, now,
+                ])
+                for aspect in comment.get('aspects', []):
+                    aspect_rows.append([
+                        comment_id, aspect['aspect_name'], aspect.get('aspect_text') or '',
+                        aspect['sentiment'], now,
+                    ])
+
+        self.copy(Post, ['id', 'caption', 'caption_hash', 'source_id', 'user_id', 'status',
+                         'created_at', 'updated_at', 'version'], post_rows)
+        self.copy(Comment, ['id', 'post_id', 'text', 'text_hash', 'general_sentiment',
+                            'created_at', 'updated_at'], comment_rows)
+        self.copy(Aspect, ['comment_id', 'aspect_name', 'aspect_text', 'sentiment',
+                           'updated_at'], aspect_rows)
+
+        if self.dedup != 'off' and settings.QA_FORM_DEDUP_NEAR:
+            index_captions(
+                Post(pk=post_ids[index], source_id=sources[posts[index]['source'].upper()].id,
+                     caption=posts[index]['caption'])
+                for index in new
+            )
+        merged = {
+            target.pk: target.user_id
+            for target, comments in zip(targets, comments_data)
+            if isinstance(target, Post) and comments
+        }
+        if merged:
+            notify_merged(merged)
+        self.duplicates += len(posts) - len(new)
+        return counts
+
+    def reserve_ids(self, model, count):
+        # Take ids from the table's sequence up front so child rows can
+        # reference their parents without reading anything back
+        if not count:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [model._meta.db_table, count]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def copy(self, model, columns, rows):
+        if not rows:
+            return
+        buffer = io.StringIO()
+        # Quote everything so empty strings are not read back as NULL
+        csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+        buffer.seek(0)
+
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(model._meta.db_table)} ({', '.join(quote(c) for c in columns)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
@@ -0,0 +1,146 @@
+# backend/qa_form/management/commands/load_test.py
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Read-heavy endpoints hit by the annotators' dashboard, with their share of
+# the generated traffic. The export is included on purpose: with sync
+# workers one running export blocks its whole process.
+SCENARIO = [
+    ('/api/posts/', 4),
+    ('/api/posts/unreviewed/', 4),
+    ('/api/posts/dashboard_stats/', 2),
+    ('/api/sources/search/?q=S', 2),
+    ('/api/posts/export_csv/', 1),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate concurrent read traffic against a running server and report '
+        'throughput and latency percentiles per endpoint. Run it once against '
+        'the sync profile and once with GUNICORN_WORKER_CLASS=gthread to '
+        'compare them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='Server to test, e.g. http://localhost:8000')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Simultaneous clients (default: 32)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Seconds to generate traffic for (default: 30)'
+        )
+        parser.add_argument(
+            '--label',
+            default='',
+            help='Name of the run in the report, e.g. "sync" or "gthread"'
+        )
+        parser.add_argument(
+            '--json',
+            dest='json_path',
+            help='Also write the results to this JSON file'
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        token = self.login(base_url, options['username'], options['password'])
+        urls = [url for url, weight in SCENARIO for _ in range(weight)]
+
+        timings = {url: [] for url, _ in SCENARIO}
+        errors = {url: 0 for url, _ in SCENARIO}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def client(number):
+            index = number
+            while time.monotonic() < deadline:
+                url = urls[index % len(urls)]
+                index += 1
+                request = Request(base_url + url, headers={'Authorization': f'JWT {token}'})
+                started = time.perf_counter()
+                try:
+                    with urlopen(request, timeout=120) as response:
+                        # Read the whole body, streaming exports included
+                        while response.read(65536):
+                            pass
+                    ok = True
+                except (HTTPError, URLError, OSError):
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    if ok:
+                        timings[url].append(elapsed)
+                    else:
+                        errors[url] += 1
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(client, range(options['concurrency'])))
+        elapsed = time.monotonic() - started
+
+        results = {
+            'label': options['label'],
+            'concurrency': options['concurrency'],
+            'duration': elapsed,
+            'endpoints': {},
+        }
+        all_timings = [value for values in timings.values() for value in values]
+        if not all_timings:
+            raise CommandError('No request succeeded')
+
+        self.stdout.write(
+            f"\n{options['label'] or 'run'}: {options['concurrency']} clients, {elapsed:.1f}s"
+        )
+        self.stdout.write(f"{'endpoint':32} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for url, values in [*timings.items(), ('total', all_timings)]:
+            failed = sum(errors.values()) if url == 'total' else errors[url]
+            stats = {
+                'requests': len(values),
+                'throughput': len(values) / elapsed,
+                'p50': statistics.median(values) if values else None,
+                'p99': percentile(values, 0.99) if values else None,
+                'errors': failed,
+            }
+            results['endpoints'][url] = stats
+            self.stdout.write(
+                f"{url:32} {stats['throughput']:8.1f} "
+                f"{stats['p50'] or 0:8.1f} {stats['p99'] or 0:8.1f} {failed:7}"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def login(self, base_url, username, password):
+        request = Request(
+            f'{base_url}/auth/jwt/create/',
+            data=json.dumps({'username': username, 'password': password}).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urlopen(request, timeout=30) as response:
+                return json.load(response)['access']
+        except HTTPError as exc:
+            raise CommandError(f'Login failed with status {exc.code}')
+        except URLError as exc:
+            raise CommandError(f'Cannot reach {base_url}: {exc.reason}')
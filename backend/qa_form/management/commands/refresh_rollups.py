@@ -0,0 +1,46 @@
+# backend/qa_form/management/commands/refresh_rollups.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...api.analytics import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the analytics rollup tables, recomputing only the '
+        '(collector, day) partitions changed since the previous run'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every partition instead of the changed ones'
+        )
+        parser.add_argument(
+            '--overlap',
+            type=int,
+            default=60,
+            help='Seconds re-checked before the previous run, for late commits (default: 60)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help='Keep running, refreshing every INTERVAL seconds'
+        )
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            run = refresh_rollups(full=full, overlap=options['overlap'])
+            self.stdout.write(
+                f"{'Full' if run.full else 'Incremental'} refresh of {run.partitions} "
+                f"partition(s) in {(run.finished_at - run.started_at).total_seconds():.2f}s"
+            )
+            if not options['interval']:
+                break
+            full = False
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,231 @@
+# backend/qa_form/management/commands/run_benchmarks.py
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ...api.stats import invalidate_dashboard_stats
+from ...api.typeahead import source_index
+from ...models import Post, Comment, Aspect
+
+USER_PREFIX = 'bench-collector'
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot qa_form endpoints at growing data volumes. '
+        'Synthetic data (generate_corpus) is added up to each scale in turn, '
+        'then every endpoint is timed as the busiest collector, reporting '
+        'latency, query count, response size and peak memory. Run it against '
+        'a scratch database: the data is left in place.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            default='10000,100000,1000000',
+            help='Comma separated comment counts to benchmark at (default: 10000,100000,1000000)'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per endpoint (default: 5)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated data (default: 0)')
+        parser.add_argument(
+            '--json',
+            dest='json_path',
+            help='Also write the results to this file, for comparing runs over time'
+        )
+
+    def handle(self, *args, **options):
+        scales = sorted(int(scale) for scale in options['scales'].split(','))
+        results = {
+            'started_at': timezone.now().isoformat(),
+            'commit': self.git_commit(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': options['repeat'],
+            'scales': [],
+        }
+
+        # Replicas would not have the data; every query goes to the primary
+        with override_settings(ALLOWED_HOSTS=['*'], QA_FORM_REPLICA_DATABASES=[]):
+            for number, scale in enumerate(scales):
+                seconds = self.seed(scale, options['seed'] + number)
+                self.stdout.write(f'== {Comment.objects.count()} comments (seeded in {seconds:.1f}s)')
+                results['scales'].append(self.run_scale(scale, seconds, options['repeat']))
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['json_path']}"))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def seed(self, scale, seed):
+        """Generate and load comments until the database holds ``scale``."""
+        missing = scale - Comment.objects.count()
+        if missing <= 0:
+            return 0.0
+        started = time.monotonic()
+        descriptor, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(descriptor)
+        try:
+            call_command(
+                'generate_corpus', path, comments=missing, seed=seed,
+                user_prefix=USER_PREFIX, create_users=True, stdout=self.stdout
+            )
+            call_command(
+                'load_corpus', path, checkpoint=f'{path}.checkpoint', batch_size=2000,
+                # Short random comments may repeat; keep the scale exact
+                dedup='off', stdout=io.StringIO()
+            )
+        finally:
+            for leftover in (path, f'{path}.checkpoint'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        return time.monotonic() - started
+
+    def run_scale(self, scale, seed_seconds, repeat):
+        user = (
+            User.objects
+            .filter(username__startswith=USER_PREFIX)
+            .annotate(posts_count=Count('posts'))
+            .order_by('-posts_count')
+            .first()
+        )
+        if user is None:
+            raise CommandError('No benchmark collector found')
+        client = APIClient()
+        client.force_authenticate(user)
+        source_index.refresh()
+
+        user_posts = Post.objects.filter(user=user)
+        # The nested update rewrites the collector's biggest unreviewed post
+        updated = (
+            user_posts.filter(status='unreviewed')
+            .annotate(comments_count=Count('comments'))
+            .order_by('-comments_count')
+            .first()
+        )
+        if updated is None:
+            raise CommandError(f'{user.username} has no unreviewed posts')
+        # Each review takes another unreviewed post
+        to_review = iter(
+            user_posts.filter(status='unreviewed').exclude(pk=updated.pk)
+            .order_by('created_at').values_list('pk', flat=True)[:repeat + 2]
+        )
+
+        def put_update():
+            payload = client.get(f'/api/posts/{updated.pk}/').json()
+            return lambda: client.put(f'/api/posts/{updated.pk}/', payload, format='json')
+
+        def post_review():
+            pk = next(to_review)
+            return lambda: client.post(f'/api/posts/{pk}/review/', {}, format='json')
+
+        def get(url, setup=None):
+            def prepare():
+                if setup:
+                    setup()
+                return lambda: client.get(url)
+            return prepare
+
+        endpoints = [
+            ('GET /api/posts/', get('/api/posts/')),
+            ('GET /api/posts/?fields=summary', get('/api/posts/?fields=summary')),
+            ('GET /api/posts/unreviewed/', get('/api/posts/unreviewed/')),
+            ('GET /api/posts/reviewed/', get('/api/posts/reviewed/')),
+            (f'PUT /api/posts/{{post}}/ ({updated.comments_count} comments)', put_update),
+            ('POST /api/posts/{post}/review/', post_review),
+            ('GET /api/posts/export_csv/', get('/api/posts/export_csv/')),
+            # Measured cold: the cached entry is dropped before each run
+            ('GET /api/posts/dashboard_stats/', get(
+                '/api/posts/dashboard_stats/', lambda: invalidate_dashboard_stats(user.id)
+            )),
+            ('GET /api/sources/search/?q=IN', get('/api/sources/search/?q=IN')),
+        ]
+
+        rows = []
+        for name, prepare in endpoints:
+            row = self.measure(prepare, repeat)
+            rows.append({'endpoint': name, **row})
+            self.stdout.write(
+                f"{name:52} p50 {row['p50_ms']:9.1f} ms  p95 {row['p95_ms']:9.1f} ms  "
+                f"{row['queries']:4} queries  {row['response_bytes'] / 1024:10.0f} KiB  "
+                f"peak {row['peak_memory_kib']:9.0f} KiB"
+            )
+
+        return {
+            'scale': scale,
+            'posts': Post.objects.count(),
+            'comments': Comment.objects.count(),
+            'aspects': Aspect.objects.count(),
+            'seed_seconds': round(seed_seconds, 2),
+            'collector': user.username,
+            'collector_posts': user_posts.count(),
+            'endpoints': rows,
+        }
+
+    def measure(self, prepare, repeat):
+        """
+        Time ``repeat`` requests after one warm-up, then make one more under
+        tracemalloc for the peak memory and the query count. ``prepare`` is
+        called before every request (untimed) and returns the request.
+        """
+        def run():
+            response = prepare()()
+            if response.status_code >= 400:
+                raise CommandError(f'{response.status_code}: {response.content[:200]}')
+            # Drain streamed responses so the whole export is measured
+            if response.streaming:
+                return sum(len(chunk) for chunk in response.streaming_content)
+            return len(response.content)
+
+        run()
+        timings = []
+        for _ in range(repeat):
+            request = prepare()
+            started = time.perf_counter()
+            response = request()
+            if response.streaming:
+                for _chunk in response.streaming_content:
+                    pass
+            timings.append((time.perf_counter() - started) * 1000)
+
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                size = run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': len(queries),
+            'response_bytes': size,
+            'peak_memory_kib': round(peak / 1024),
+        }
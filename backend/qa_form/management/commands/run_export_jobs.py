@@ -0,0 +1,58 @@
+# backend/qa_form/management/commands/run_export_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...api.jobs import claim_export_job, expire_export_jobs, requeue_stale_export_jobs, run_export_job
+from ...metrics import WORKER
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the export jobs submitted through /api/exports/, taking them from '
+        'the database-backed queue one at a time. Several workers can run side '
+        'by side. Also requeues the jobs of workers that died and deletes '
+        'expired export files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=2,
+            help='Seconds to wait before looking again when the queue is empty (default: 2)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for more jobs'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            requeued, failed = requeue_stale_export_jobs()
+            if requeued or failed:
+                self.stdout.write(f'Requeued {requeued} and failed {failed} stale job(s)')
+            expired = expire_export_jobs()
+            if expired:
+                self.stdout.write(f'Deleted {expired} expired job(s)')
+
+            job = claim_export_job(WORKER)
+            if job is not None:
+                started = time.monotonic()
+                run_export_job(job)
+                message = (
+                    f'Export {job.pk} ({job.format}, {job.rows_done} comments) '
+                    f'{job.status} in {time.monotonic() - started:.1f}s'
+                )
+                if job.status == 'succeeded':
+                    self.stdout.write(self.style.SUCCESS(message))
+                else:
+                    self.stdout.write(self.style.ERROR(f'{message}: {job.error}'))
+                continue
+
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(options['poll'])
@@ -0,0 +1,230 @@
+# backend/qa_form/metrics.py
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Upper bounds of the histogram buckets (the last, +Inf bucket is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+# name -> (help, buckets) of the histograms kept per endpoint
+HISTOGRAMS = {
+    'request_seconds': ('Request latency, to the last byte of streamed responses', LATENCY_BUCKETS),
+    'db_queries': ('Database queries per request', QUERY_COUNT_BUCKETS),
+    'db_seconds': ('Time spent in database queries per request', LATENCY_BUCKETS),
+    'serializer_seconds': ('Time spent serializing per request', LATENCY_BUCKETS),
+    'response_bytes': ('Response body size', SIZE_BUCKETS),
+}
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = 'qa_form:metrics:workers'
+WORKER = f'{socket.gethostname()}:{os.getpid()}'
+
+
+def empty_entry():
+    return {
+        'responses': {},
+        **{
+            name: {'buckets': [0] * (len(buckets) + 1), 'sum': 0, 'count': 0}
+            for name, (_, buckets) in HISTOGRAMS.items()
+        },
+    }
+
+
+class RequestStats:
+    """What one request spent, filled in while it runs."""
+    __slots__ = ('endpoint', 'queries', 'db_seconds', 'serializer_seconds')
+
+    def __init__(self):
+        self.endpoint = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+
+_current = ContextVar('qa_form_request_stats', default=None)
+
+
+@contextmanager
+def measuring(stats):
+    """Make ``stats`` the current request's, for the serializer and query hooks."""
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed_serialization():
+    """Add the time spent in the block to the current request's serializer time."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_seconds += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting and timing the current request's queries."""
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            elapsed = time.perf_counter() - started
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if elapsed * 1000 >= settings.QA_FORM_METRICS_SLOW_QUERY_MS:
+                registry.sample_slow_query(stats.endpoint, sql, elapsed)
+
+
+class Registry:
+    """
+    Per-process counters and histograms per endpoint, plus the latest slow
+    query samples. Every QA_FORM_METRICS_PUBLISH_SECONDS each worker writes
+    its snapshot to the cache, where the metrics endpoint merges them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.slow_queries = deque(maxlen=settings.QA_FORM_METRICS_SLOW_QUERY_SAMPLES)
+        self.published_at = time.monotonic()
+
+    def observe(self, endpoint, status_code, seconds, stats, size):
+        values = {
+            'request_seconds': seconds,
+            'db_queries': stats.queries,
+            'db_seconds': stats.db_seconds,
+            'serializer_seconds': stats.serializer_seconds,
+            'response_bytes': size,
+        }
+        status_class = f'{status_code // 100}xx'
+        with self.lock:
+            entry = self.endpoints.get(endpoint)
+            if entry is None:
+                entry = self.endpoints[endpoint] = empty_entry()
+            entry['responses'][status_class] = entry['responses'].get(status_class, 0) + 1
+            for name, value in values.items():
+                histogram = entry[name]
+                histogram['buckets'][bisect_left(HISTOGRAMS[name][1], value)] += 1
+                histogram['sum'] += value
+                histogram['count'] += 1
+        self.maybe_publish()
+
+    def sample_slow_query(self, endpoint, sql, seconds):
+        logger.warning('Slow query (%.0f ms) in %s: %s', seconds * 1000, endpoint, sql[:2000])
+        self.slow_queries.append({
+            'endpoint': endpoint,
+            'ms': round(seconds * 1000, 1),
+            'sql': sql[:2000],
+            'at': time.time(),
+            'worker': WORKER,
+        })
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'endpoints': {
+                    endpoint: {
+                        'responses': dict(entry['responses']),
+                        **{
+                            name: {**entry[name], 'buckets': list(entry[name]['buckets'])}
+                            for name in HISTOGRAMS
+                        },
+                    }
+                    for endpoint, entry in self.endpoints.items()
+                },
+                'slow_queries': list(self.slow_queries),
+            }
+
+    def maybe_publish(self):
+        now = time.monotonic()
+        if now - self.published_at < settings.QA_FORM_METRICS_PUBLISH_SECONDS:
+            return
+        self.published_at = now
+        self.publish()
+
+    def publish(self):
+        # Snapshots of workers that are gone expire; the index is rewritten
+        # by every publish, so a lost update only delays a worker by a round
+        ttl = settings.QA_FORM_METRICS_PUBLISH_SECONDS * 10
+        cache.set(f'qa_form:metrics:{WORKER}', self.snapshot(), ttl)
+        workers = set(cache.get(INDEX_KEY, ())) | {WORKER}
+        live = cache.get_many([f'qa_form:metrics:{worker}' for worker in workers])
+        cache.set(INDEX_KEY, sorted(key.split(':', 2)[2] for key in live), ttl)
+
+
+registry = Registry()
+
+
+def collect():
+    """
+    Merge the snapshots of every worker: this one's live, the others' as
+    last published. Counters are cumulative since each worker started.
+    """
+    snapshots = {WORKER: registry.snapshot()}
+    others = [worker for worker in cache.get(INDEX_KEY, ()) if worker != WORKER]
+    for key, snapshot in cache.get_many([f'qa_form:metrics:{worker}' for worker in others]).items():
+        snapshots[key.split(':', 2)[2]] = snapshot
+
+    endpoints, slow_queries = {}, []
+    for snapshot in snapshots.values():
+        slow_queries.extend(snapshot['slow_queries'])
+        for endpoint, entry in snapshot['endpoints'].items():
+            merged = endpoints.setdefault(endpoint, empty_entry())
+            for status_class, count in entry['responses'].items():
+                merged['responses'][status_class] = merged['responses'].get(status_class, 0) + count
+            for name in HISTOGRAMS:
+                merged[name]['buckets'] = [a + b for a, b in zip(merged[name]['buckets'], entry[name]['buckets'])]
+                merged[name]['sum'] += entry[name]['sum']
+                merged[name]['count'] += entry[name]['count']
+
+    slow_queries.sort(key=lambda sample: sample['at'], reverse=True)
+    return {
+        'workers': sorted(snapshots),
+        'endpoints': dict(sorted(endpoints.items())),
+        'slow_queries': slow_queries[:settings.QA_FORM_METRICS_SLOW_QUERY_SAMPLES],
+    }
+
+
+def to_prometheus(metrics):
+    """Render ``collect()`` output in the Prometheus text exposition format."""
+    lines = []
+    lines.append('# HELP qa_form_responses_total Responses by endpoint and status class')
+    lines.append('# TYPE qa_form_responses_total counter')
+    for endpoint, entry in metrics['endpoints'].items():
+        for status_class, count in sorted(entry['responses'].items()):
+            lines.append(f'qa_form_responses_total{{endpoint="{endpoint}",status="{status_class}"}} {count}')
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        metric = f'qa_form_{name}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for endpoint, entry in metrics['endpoints'].items():
+            histogram = entry[name]
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), histogram['buckets']):
+                cumulative += count
+                le = bound if bound == '+Inf' else f'{bound:g}'
+                lines.append(f'{metric}_bucket{{endpoint="{endpoint}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{endpoint="{endpoint}"}} {histogram["sum"]}')
+            lines.append(f'{metric}_count{{endpoint="{endpoint}"}} {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
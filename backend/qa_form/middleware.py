@@ -0,0 +1,88 @@
+# backend/qa_form/middleware.py
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import RequestStats, measuring, record_query, registry
+
+
+def endpoint_name(request):
+    """
+    Name requests by view and action, e.g. "PostViewSet.export_csv", so
+    every URL of a route (whatever the pk) shares its metrics.
+    """
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    view = match.func
+    cls = getattr(view, 'cls', None)
+    if cls is None:
+        return match.view_name
+    actions = getattr(view, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f'{cls.__name__}.{action}'
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the latency, database queries and time, serializer time and
+    response size of every request in the metrics registry, per endpoint.
+    Streamed responses are measured until their last chunk is sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QA_FORM_METRICS_ENABLED:
+            return self.get_response(request)
+
+        stats = request.metrics_stats = RequestStats()
+        started = time.perf_counter()
+        with self.instrument(stats):
+            response = self.get_response(request)
+        if stats.endpoint is None:
+            stats.endpoint = endpoint_name(request)
+
+        if response.streaming:
+            response.streaming_content = self.measure_stream(
+                response.streaming_content, request, response, stats, started
+            )
+        else:
+            registry.observe(
+                stats.endpoint, response.status_code, time.perf_counter() - started,
+                stats, len(response.content)
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Named as soon as the URL is resolved, for the slow query samples
+        stats = getattr(request, 'metrics_stats', None)
+        if stats is not None:
+            stats.endpoint = endpoint_name(request)
+
+    def instrument(self, stats):
+        stack = ExitStack()
+        stack.enter_context(measuring(stats))
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(record_query))
+        return stack
+
+    def measure_stream(self, chunks, request, response, stats, started):
+        size = 0
+        try:
+            chunks = iter(chunks)
+            while True:
+                # Exports run their queries while streaming
+                with self.instrument(stats):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            registry.observe(
+                stats.endpoint, response.status_code, time.perf_counter() - started, stats, size
+            )
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+from qa_form.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently, outside a transaction, so the
+    # tables stay writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ('qa_form', '0003_updated_at_tombstone'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='aspect',
+            index=models.Index(fields=['comment', 'id'], name='aspect_comment_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['post', 'id'], name='comment_post_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='post_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['user', 'status', 'created_at', 'id'], name='post_user_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'unreviewed')), fields=['user', 'created_at', 'id'], name='post_unreviewed_queue_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['user', 'updated_at'], name='post_user_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='source',
+            index=models.Index(fields=['-usage_count'], name='source_usage_count_idx'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:58
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# (table, text column) pairs whose search_vector is maintained by a trigger.
+# The 'simple' configuration lowercases words without stemming or stop
+# words, since captions and comments are not only in English.
+SEARCH_COLUMNS = [
+    ('qa_form_post', 'caption'),
+    ('qa_form_comment', 'text'),
+    ('qa_form_aspect', 'aspect_text'),
+]
+
+
+# Rows per UPDATE of the backfill; each batch commits on its own
+BACKFILL_BATCH_SIZE = 5000
+
+
+def create_search_triggers(apps, schema_editor):
+    # Triggers and GIN indexes are PostgreSQL only; on other databases the
+    # columns stay empty and the search endpoint is unavailable
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in SEARCH_COLUMNS:
+        # The trigger also covers bulk_create, bulk_update and COPY
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_search_vector_trigger "
+            f"BEFORE INSERT OR UPDATE OF {column} ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION "
+            f"tsvector_update_trigger(search_vector, 'pg_catalog.simple', {column})"
+        )
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # Rows written from here on get their vector from the trigger; the
+    # existing ones are filled in id ranges, so no statement holds the row
+    # locks of a whole table. Rerunning skips the rows already filled
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in SEARCH_COLUMNS:
+            cursor.execute(f"SELECT coalesce(max(id), 0) FROM {table}")
+            last_id = cursor.fetchone()[0]
+            for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+                cursor.execute(
+                    f"UPDATE {table} SET search_vector = "
+                    f"to_tsvector('pg_catalog.simple', coalesce({column}, '')) "
+                    f"WHERE id > %s AND id <= %s AND search_vector IS NULL",
+                    [start, start + BACKFILL_BATCH_SIZE]
+                )
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, _ in SEARCH_COLUMNS:
+        # Concurrently, so the tables stay writable while the index is built
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_search_vector_idx "
+            f"ON {table} USING gin (search_vector)"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, _ in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {table}_search_vector_idx")
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+
+
+class Migration(migrations.Migration):
+    # Not atomic: the backfill commits batch by batch and the GIN indexes are
+    # built concurrently, so posts, comments and aspects stay writable
+    atomic = False
+
+    dependencies = [
+        ('qa_form', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aspect',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
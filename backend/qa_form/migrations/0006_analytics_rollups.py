@@ -0,0 +1,67 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('qa_form', '0005_search_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('full', models.BooleanField(default=False)),
+                ('partitions', models.IntegerField()),
+            ],
+            options={
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='AspectSentimentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('aspect_name', models.CharField(max_length=100)),
+                ('sentiment', models.CharField(choices=[('positive', 'Positive'), ('neutral', 'Neutral'), ('negative', 'Negative')], max_length=10)),
+                ('count', models.IntegerField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='qa_form.source')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CommentSentimentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('general_sentiment', models.CharField(choices=[('positive', 'Positive'), ('neutral', 'Neutral'), ('negative', 'Negative')], max_length=10)),
+                ('count', models.IntegerField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='qa_form.source')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='comment_rollup_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='commentsentimentrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day', 'source', 'general_sentiment'), name='comment_rollup_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='aspectsentimentrollup',
+            index=models.Index(fields=['day'], name='aspect_rollup_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='aspectsentimentrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day', 'source', 'aspect_name', 'sentiment'), name='aspect_rollup_unique'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from qa_form.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # The queue index is built concurrently, outside a transaction, so the
+    # posts table stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('qa_form', '0007_post_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_posts', to=settings.AUTH_USER_MODEL),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'unreviewed')), fields=['created_at', 'id'], name='post_review_queue_idx'),
+        ),
+    ]
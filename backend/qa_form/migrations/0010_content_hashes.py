@@ -0,0 +1,80 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from qa_form.dedup import content_hash
+from qa_form.operations import AddIndexConcurrently
+
+
+def backfill_hashes(apps, schema_editor):
+    # Keyset batches, so large tables are hashed in bounded memory; the
+    # migration is not atomic, so each batch also commits on its own
+    for model_name, text_field, hash_field in (
+        ('Post', 'caption', 'caption_hash'),
+        ('Comment', 'text', 'text_hash'),
+    ):
+        model = apps.get_model('qa_form', model_name)
+        last_id = 0
+        while True:
+            batch = list(model.objects.filter(id__gt=last_id).order_by('id').only('id', text_field)[:2000])
+            if not batch:
+                break
+            for row in batch:
+                setattr(row, hash_field, content_hash(getattr(row, text_field)))
+            model.objects.bulk_update(batch, [hash_field])
+            last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+    # The backfill commits batch by batch and the indexes of the existing
+    # tables are built concurrently, so posts and comments stay writable
+    atomic = False
+
+    dependencies = [
+        ('qa_form', '0009_export_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaptionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='text_hash',
+            field=models.CharField(editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='caption_hash',
+            field=models.CharField(editable=False, max_length=32, null=True),
+        ),
+        # Hash the existing rows before their indexes are built
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['post', 'text_hash'], name='comment_text_hash_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['source', 'caption_hash'], name='post_caption_hash_idx'),
+        ),
+        migrations.AddField(
+            model_name='captionband',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='qa_form.post'),
+        ),
+        migrations.AddField(
+            model_name='captionband',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='qa_form.source'),
+        ),
+        migrations.AddIndex(
+            model_name='captionband',
+            index=models.Index(fields=['source', 'bucket'], name='caption_band_bucket_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+from qa_form.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # The new index is built before the old one goes, both concurrently, so
+    # delta exports keep an index and the posts table stays writable
+    atomic = False
+
+    dependencies = [
+        ('qa_form', '0010_content_hashes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['user', 'updated_at', 'version'], name='post_user_changes_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='post',
+            name='post_user_updated_idx',
+        ),
+    ]
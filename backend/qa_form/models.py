@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+
+from .dedup import content_hash
 
 class Source(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -7,6 +11,14 @@ class Source(models.Model):
     last_used = models.DateTimeField(auto_now=True)
     usage_count = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # Typeahead: prefix matches on name are served by the
+            # varchar_pattern_ops index Django adds for the unique name; this
+            # one lets short prefixes walk sources by popularity instead
+            models.Index(fields=['-usage_count'], name='source_usage_count_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         # Convert name to uppercase before saving
         self.name = self.name.upper()
@@ -25,6 +37,7 @@ class Post(models.Model):
     caption = models.TextField()
     source = models.ForeignKey(Source, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
 
     # New fields for review process
@@ -42,6 +55,64 @@ class Post(models.Model):
     )
     reviewed_at = models.DateTimeField(null=True, blank=True)
 
+    # Review queue lease: the reviewer working on the post, until when
+    claimed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='claimed_posts'
+    )
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Bumped on every change to the post or its comments and aspects; the
+    # ETag of the post detail endpoint
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    # Full-text search; kept up to date by a database trigger (migration 0005)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Hash of the normalized caption; posts with the same one for the same
+    # source are duplicates (see dedup.py and api.ingest)
+    caption_hash = models.CharField(max_length=32, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Post list and dashboard, in cursor pagination order
+            models.Index(fields=['user', 'created_at', 'id'], name='post_user_created_idx'),
+            # Reviewed/unreviewed queues
+            models.Index(fields=['user', 'status', 'created_at', 'id'], name='post_user_status_idx'),
+            # The unreviewed queue is the hot one and shrinks as work gets
+            # done, so it also gets a small partial index of its own
+            models.Index(
+                fields=['user', 'created_at', 'id'],
+                condition=models.Q(status='unreviewed'),
+                name='post_unreviewed_queue_idx'
+            ),
+            # Delta exports; the version makes ETags index-only (conditional.py)
+            models.Index(fields=['user', 'updated_at', 'version'], name='post_user_changes_idx'),
+            # Shared review queue, claimed oldest first across collectors
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(status='unreviewed'),
+                name='post_review_queue_idx'
+            ),
+            # Duplicate lookups on ingest
+            models.Index(fields=['source', 'caption_hash'], name='post_caption_hash_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.caption_hash = content_hash(self.caption)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def touch(cls, post_ids):
+        """Mark posts as changed after a write to their comments or aspects."""
+        cls.objects.filter(id__in=post_ids).update(
+            version=models.F('version') + 1,
+            updated_at=timezone.now()
+        )
+
     def __str__(self):
         return f"Post {self.id} from {self.source} by {self.user.username}"
 
@@ -56,6 +127,25 @@ class Comment(models.Model):
     text = models.TextField()
     general_sentiment = models.CharField(max_length=10, choices=SENTIMENT_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Hash of the normalized text; a post's comments with the same one are
+    # duplicates
+    text_hash = models.CharField(max_length=32, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pages of exports walk comments in (post_id, id) order
+            models.Index(fields=['post', 'id'], name='comment_post_id_idx'),
+            # Cursor pages of a post's comments (see CreatedAtCursorPagination)
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+            # Duplicate lookups on ingest
+            models.Index(fields=['post', 'text_hash'], name='comment_text_hash_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.text_hash = content_hash(self.text)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Comment {self.id} on {self.post}"
@@ -71,9 +161,179 @@ class Aspect(models.Model):
     aspect_name = models.CharField(max_length=100)
     aspect_text = models.TextField(blank=True)
     sentiment = models.CharField(max_length=10, choices=SENTIMENT_CHOICES)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['id']
+        indexes = [
+            # Aspects are always fetched per comment, in id order
+            models.Index(fields=['comment', 'id'], name='aspect_comment_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.aspect_name} - {self.sentiment}"
+
+class Tombstone(models.Model):
+    """
+    Marker left behind when a Post, Comment or Aspect is deleted, so delta
+    exports can tell clients what to drop. Deleting a row also deletes its
+    children, so only the row that was explicitly deleted is recorded.
+    """
+    OBJECT_TYPE_CHOICES = [
+        ('post', 'Post'),
+        ('comment', 'Comment'),
+        ('aspect', 'Aspect'),
+    ]
+
+    object_type = models.CharField(max_length=10, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+    @classmethod
+    def record(cls, object_type, deletions):
+        """Record ``(object_id, user_id)`` pairs of ``object_type`` in one query."""
+        cls.objects.bulk_create([
+            cls(object_type=object_type, object_id=object_id, user_id=user_id)
+            for object_id, user_id in deletions
+        ])
+
+    def __str__(self):
+        return f"Deleted {self.object_type} {self.object_id}"
+
+class AspectSentimentRollup(models.Model):
+    """
+    Number of aspects per collector, day, source, aspect name and sentiment.
+    Days are the day the post was collected. Maintained by the
+    ``refresh_rollups`` command; see ``api.analytics``.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name='+')
+    aspect_name = models.CharField(max_length=100)
+    sentiment = models.CharField(max_length=10, choices=Aspect.SENTIMENT_CHOICES)
+    count = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'source', 'aspect_name', 'sentiment'],
+                name='aspect_rollup_unique'
+            ),
+        ]
+        indexes = [
+            # Analyst queries across all collectors filter on days first
+            models.Index(fields=['day'], name='aspect_rollup_day_idx'),
+        ]
+
+class CommentSentimentRollup(models.Model):
+    """Number of comments per collector, day, source and general sentiment."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name='+')
+    general_sentiment = models.CharField(max_length=10, choices=Comment.SENTIMENT_CHOICES)
+    count = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'source', 'general_sentiment'],
+                name='comment_rollup_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='comment_rollup_day_idx'),
+        ]
+
+class RollupRefresh(models.Model):
+    """One run of ``refresh_rollups``; the last one is the next run's watermark."""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    full = models.BooleanField(default=False)
+    partitions = models.IntegerField()
+
+    class Meta:
+        get_latest_by = 'started_at'
+
+class CaptionBand(models.Model):
+    """
+    One LSH band bucket of a post caption's MinHash signature: posts of a
+    source sharing a bucket are candidate near-duplicates (see dedup.py).
+    Written on ingest while QA_FORM_DEDUP_NEAR is on; ``index_captions``
+    fills them in for older posts. Candidates are checked against the
+    current caption, so buckets left behind by an edit do no harm.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name='+')
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['source', 'bucket'], name='caption_band_bucket_idx'),
+        ]
+
+class ExportJob(models.Model):
+    """
+    An export of a collector's posts, built in the background. The table is
+    also the queue: ``run_export_jobs`` workers claim queued jobs, report
+    progress as they go and leave the file for download until it expires.
+    See ``api.jobs``.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV (gzip)'),
+        ('jsonl', 'JSON lines (gzip)'),
+        ('parquet', 'Parquet'),
+        ('arrow', 'Arrow IPC'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When a worker took the job, i.e. the moment the exported data is from
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Updated with every batch written; a running job whose heartbeat stops
+    # is handed to another worker
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # Progress, in comments
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_done = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to='exports/', blank=True)
+    size = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            # Identical requests share the queued job instead of piling up
+            models.UniqueConstraint(
+                fields=['user', 'format'],
+                condition=models.Q(status='queued'),
+                name='export_job_queued_unique'
+            ),
+        ]
+        indexes = [
+            # Workers take the oldest queued job
+            models.Index(fields=['status', 'created_at'], name='export_job_status_idx'),
+            # Reusing the latest job of a user and format
+            models.Index(fields=['user', 'format', 'created_at'], name='export_job_user_idx'),
+            models.Index(fields=['expires_at'], name='export_job_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export {self.id} ({self.format}) of {self.user_id}: {self.status}"
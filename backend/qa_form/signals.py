@@ -0,0 +1,32 @@
+# backend/qa_form/signals.py
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .db_router import reset_reads
+from .models import Source
+
+# Sent after a request (or command) changes a user's posts, comments or
+# aspects. Bulk writes skip the model save/delete signals, so this is the one
+# hook that covers every write path. Arguments: user_id.
+posts_changed = Signal()
+
+
+@receiver(posts_changed)
+def invalidate_dashboard_stats(sender, user_id, **kwargs):
+    from .api.stats import invalidate_dashboard_stats
+    invalidate_dashboard_stats(user_id)
+
+
+@receiver([post_save, post_delete], sender=Source)
+def refresh_source_index(sender, **kwargs):
+    from .api.typeahead import bump_sources_version
+    transaction.on_commit(bump_sources_version)
+
+
+# Replica routing is decided per request; never let it leak into the next
+# request served by the same thread. Streaming responses finish (and send
+# request_finished) only once their content has been consumed.
+request_started.connect(reset_reads, dispatch_uid='qa_form_reset_reads_started')
+request_finished.connect(reset_reads, dispatch_uid='qa_form_reset_reads_finished')
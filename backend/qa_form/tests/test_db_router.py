@@ -0,0 +1,60 @@
+# backend/qa_form/tests/test_db_router.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..db_router import ReplicaRouter, pin_key, pin_to_primary, reset_reads, route_reads
+from ..models import Post
+
+
+@override_settings(QA_FORM_REPLICA_DATABASES=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        cache.delete(pin_key(1))
+        self.addCleanup(reset_reads)
+
+    def test_reads_go_to_a_replica(self):
+        route_reads(1)
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_writes_go_to_the_primary(self):
+        route_reads(1)
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_pinned_user_reads_from_the_primary(self):
+        pin_to_primary(1)
+        route_reads(1)
+        self.assertIsNone(self.router.db_for_read(Post))
+        # Other users are not pinned
+        route_reads(2)
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_reset_between_requests(self):
+        route_reads(1)
+        reset_reads()
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_migrations_skip_replicas(self):
+        self.assertIs(self.router.allow_migrate('replica', 'qa_form'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'qa_form'))
+
+    @override_settings(QA_FORM_REPLICA_DATABASES=[])
+    def test_without_replicas_reads_go_to_the_primary(self):
+        route_reads(1)
+        self.assertIsNone(self.router.db_for_read(Post))
+
+
+@override_settings(QA_FORM_REPLICA_DATABASES=['replica'])
+class ReplicaPinningTests(TestCase):
+    def test_write_pins_the_user_to_the_primary(self):
+        user = User.objects.create_user('collector')
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.delete(pin_key(user.id))
+        response = client.post('/api/posts/', {
+            'caption': 'Caption', 'source': 'Source', 'comments': [],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(cache.get(pin_key(user.id)))
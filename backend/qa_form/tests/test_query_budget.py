@@ -0,0 +1,38 @@
+# backend/qa_form/tests/test_query_budget.py
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..api.typeahead import source_index
+from ..management.commands.check_query_budget import ENDPOINTS, build_dataset, call
+
+
+# Replicas would not see the test data, so every query goes to the primary
+@override_settings(ALLOWED_HOSTS=['*'], QA_FORM_REPLICA_DATABASES=[])
+class QueryBudgetTests(TestCase):
+    """
+    Every hot endpoint runs the same number of queries whatever the size of
+    the dataset, and no more than its budget in ENDPOINTS. Same checks as
+    ``manage.py check_query_budget``, run by the test suite.
+    """
+
+    def setUp(self):
+        # The typeahead index is loaded once per process; load it up front
+        # so both datasets measure it warm
+        source_index.refresh()
+
+    def test_endpoints_within_budget(self):
+        small = build_dataset(posts=1, comments=1, aspects=1)
+        large = build_dataset(posts=20, comments=5, aspects=3)
+        for method, url, budget in ENDPOINTS:
+            with self.subTest(method=method, url=url):
+                client, ids, payload = small
+                with CaptureQueriesContext(connection) as queries:
+                    response = call(client, method, url.format(**ids), payload)
+                self.assertLess(response.status_code, 400)
+                self.assertLessEqual(len(queries), budget)
+
+                client, ids, payload = large
+                with self.assertNumQueries(len(queries)):
+                    response = call(client, method, url.format(**ids), payload)
+                self.assertLess(response.status_code, 400)
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import { PostDTO } from "../../types/api";
+import { PostDTO, PostSummaryDTO } from "../../types/api";
 import { api } from "../../services/api";
 import { PostReview } from "./PostReview";
 import { VerificationProvider } from "../../contexts/VerificationContext";
@@ -16,8 +16,8 @@ interface FilterState {
 }
 
 export function VerificationHome() {
-  const [unreviewedPosts, setUnreviewedPosts] = useState<PostDTO[]>([]);
-  const [reviewedPosts, setReviewedPosts] = useState<PostDTO[]>([]);
+  const [unreviewedPosts, setUnreviewedPosts] = useState<PostSummaryDTO[]>([]);
+  const [reviewedPosts, setReviewedPosts] = useState<PostSummaryDTO[]>([]);
   const [loading, setLoading] = useState(true);
   const [currentPage, setCurrentPage] = useState(1);
   const [selectedPost, setSelectedPost] = useState<PostDTO | null>(null);
@@ -44,8 +44,13 @@ export function VerificationHome() {
     }
   };
 
-  const handleVerifyClick = (post: PostDTO) => {
-    setSelectedPost(post);
+  // The lists only carry summaries; load the post with its comments
+  const handleVerifyClick = async (post: PostSummaryDTO) => {
+    try {
+      setSelectedPost(await api.getPost(post.id!));
+    } catch (error) {
+      console.error("Error fetching post:", error);
+    }
   };
 
   const handleBackToList = async () => {
@@ -68,7 +73,7 @@ export function VerificationHome() {
     }
   };
 
-  const filterPosts = (posts: PostDTO[]) => {
+  const filterPosts = (posts: PostSummaryDTO[]) => {
     return posts.filter((post) => {
       if (
         filters.source &&
@@ -305,7 +310,7 @@ export function VerificationHome() {
                         </div>
                       </td>
                       <td className="px-3 py-4 text-sm text-gray-500">
-                        {post.comments?.length || 0} comments
+                        {post.comment_count} comments
                       </td>
                       <td className="px-3 py-4 text-sm text-gray-500">
                         {new Date(post.created_at!).toLocaleString()}
@@ -137,11 +137,12 @@ export function VerificationProvider({
       dispatch({ type: "START_SAVING" });
 
       // First update the post
-      await api.updatePost(post.id!, post);
+      const updated = await api.updatePost(post.id!, post);
 
-      // Then mark it as reviewed if it wasn't already
+      // Then mark it as reviewed if it wasn't already, unless someone else
+      // changed it in between
       if (post.status === "unreviewed") {
-        await api.reviewPost(post.id!);
+        await api.reviewPost(post.id!, updated?.version);
       }
 
       dispatch({ type: "END_SAVING" });
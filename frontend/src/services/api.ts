@@ -1,7 +1,7 @@
 // frontend/src/services/api.ts
 import { AxiosError } from "axios";
 import { authClient } from "./auth";
-import { ApiError, PostDTO } from "../types/api";
+import { ApiError, PaginatedResponse, PostDTO, PostSummaryDTO } from "../types/api";
 
 const handleApiError = (error: AxiosError): never => {
   const apiError: ApiError = {
@@ -12,11 +12,23 @@ const handleApiError = (error: AxiosError): never => {
   throw apiError;
 };
 
+// List endpoints are cursor-paginated; follow the `next` links to collect
+// every page for screens that still work on the full list
+const getAllPages = async <T>(url: string) => {
+  const results: T[] = [];
+  let next: string | null = url;
+  while (next) {
+    const response = await authClient.get<PaginatedResponse<T>>(next);
+    results.push(...response.data.results);
+    next = response.data.next;
+  }
+  return results;
+};
+
 export const api = {
   async getAllPosts() {
     try {
-      const response = await authClient.get<PostDTO[]>("api/posts/");
-      return response.data;
+      return await getAllPages<PostDTO>("api/posts/");
     } catch (error) {
       return handleApiError(error as AxiosError);
     }
@@ -31,6 +43,15 @@ export const api = {
     }
   },
 
+  async getPost(id: number) {
+    try {
+      const response = await authClient.get<PostDTO>(`api/posts/${id}/`);
+      return response.data;
+    } catch (error) {
+      return handleApiError(error as AxiosError);
+    }
+  },
+
   async updatePost(id: number, post: PostDTO) {
     try {
       // Remove fields that shouldn't be sent
@@ -108,8 +129,9 @@ export const api = {
   // new entries
   async getUnreviewedPosts() {
     try {
-      const response = await authClient.get<PostDTO[]>("api/posts/unreviewed/");
-      return response.data;
+      return await getAllPages<PostSummaryDTO>(
+        "api/posts/unreviewed/?fields=summary",
+      );
     } catch (error) {
       return handleApiError(error as AxiosError);
     }
@@ -117,17 +139,19 @@ export const api = {
 
   async getReviewedPosts() {
     try {
-      const response = await authClient.get<PostDTO[]>("api/posts/reviewed/");
-      return response.data;
+      return await getAllPages<PostSummaryDTO>(
+        "api/posts/reviewed/?fields=summary",
+      );
     } catch (error) {
       return handleApiError(error as AxiosError);
     }
   },
 
-  async reviewPost(postId: number) {
+  async reviewPost(postId: number, version?: number) {
     try {
       const response = await authClient.post<PostDTO>(
         `api/posts/${postId}/review/`,
+        version === undefined ? {} : { version },
       );
       return response.data;
     } catch (error) {
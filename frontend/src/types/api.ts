@@ -25,6 +25,21 @@ export interface PostDTO {
   status: "unreviewed" | "reviewed";
   reviewed_by?: number;
   reviewed_at?: string;
+  // Sent back with updates; the server answers 409 if the post changed since
+  version?: number;
+}
+
+// Compact representation of list screens (?fields=summary): no nested
+// comments, counted on the server instead
+export interface PostSummaryDTO extends Omit<PostDTO, "comments"> {
+  comment_count: number;
+  aspect_count: number;
+}
+
+export interface PaginatedResponse<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
 }
 
 export interface ApiError {